@@ -15,15 +15,24 @@
 # IMPORT
 #######################################################################################################################
 import tomli
-import tomli_w
 import time
 import sys
 import os
 import asyncio
+import json
+import csv
+import argparse
+import sqlite3
+import socket
+import gzip
+import queue
 import threading
+import contextlib
 import tkinter as tk
+from tkinter import messagebox
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
 from tkinter.scrolledtext import ScrolledText
-from threading import Event
 from datetime import datetime
 from bleak import BleakScanner, BleakClient
 
@@ -37,181 +46,108 @@ SW_TESTING_VERSION = "1.0.0.0"
 UUID_EEPROM_WRITE = "347b0012-7635-408b-8918-8ff3949ce592"
 UUID_EEPROM_READ = "347b0013-7635-408b-8918-8ff3949ce592"
 UUID_EEPROM_RESULT = "347b0014-7635-408b-8918-8ff3949ce592"
-SQUARE_BUTTONS_CHAR = "347b0045-7635-408b-8918-8ff3949ce592"
-SQUARE_CONTROL_POINT = "347b0044-7635-408b-8918-8ff3949ce592"
+# Common prefix and suffix of the Elite proprietary services family (347b00xx-...)
+ELITE_UUID_PREFIX = "347b00"
+ELITE_UUID_SUFFIX = "-7635-408b-8918-8ff3949ce592"
+# Characteristics used by the test of every product, which must be present in a cached GATT layout together with the
+# buttons and control point characteristics of the product
+GATT_REQUIRED_CHARS = [UUID_EEPROM_WRITE, UUID_EEPROM_READ, UUID_EEPROM_RESULT, "2A28", "2A25"]
+
+# Weight of the newest advertisement in the smoothed RSSI of the device registry
+RSSI_EWMA_ALPHA = 0.3
+# Initial and maximum pause in seconds between two EEPROM read-back polls
+EEPROM_POLL_DELAY = 0.05
+EEPROM_POLL_MAX_DELAY = 0.4
+# Refresh period of the GUI in milliseconds (changes posted by the worker are applied at most at this rate)
+UI_REFRESH_MS = 50
+# Size in pixels of a cell of the buttons grid
+BUTTON_CELL_WIDTH = 260
+BUTTON_CELL_HEIGHT = 32
+# Lines removed at once from the head of the editor when it exceeds CONSOLE_LINES
+CONSOLE_TRIM_STEP = 100
+# Time in seconds granted to the BLE worker to close the connections when the window is closed
+WORKER_SHUTDOWN_TIMEOUT = 5.0
+# Highest ANT ID, the allocator wraps to 1 after it
+ANT_ID_MAX = 65534
+# Maximum time in seconds to wait for the lock of the ANT ID store held by another station
+ANT_ID_LOCK_TIMEOUT = 10.0
+# Maximum number of firmware versions whose GATT layout is kept in the cache
+GATT_CACHE_SIZE = 8
+# Maximum time in seconds a LOG record waits before being written and synced to disk
+LOG_FSYNC_INTERVAL = 1.0
+# Time in seconds between two attempts to write the LOG records that could not be written
+LOG_RETRY_INTERVAL = 5.0
+# Attempts, and pause in seconds between them, to write the records still failing when the application is closed
+LOG_CLOSE_RETRIES = 3
+LOG_CLOSE_RETRY_DELAY = 0.5
 
 # Bluetooth request sequences
-EEPROM_ANTID_WRITE_REQUEST = bytearray(b'\x03\x01\x00\x02\x00')
-EEPROM_HWVER_WRITE_REQUEST = bytearray(b'\x03\x04\x00\x01\x00')
-EEPROM_BATCH_WRITE_REQUEST = bytearray(b'\x03\x06\x00\x01\x00')
-EEPROM_PRODUCER_WRITE_REQUEST = bytearray(b'\x03\x07\x00\x01\x00')
-EEPROM_ANTID_READ_REQUEST = bytearray(b'\x02\x01\x00\x02\x00')
-EEPROM_HWVER_READ_REQUEST = bytearray(b'\x02\x04\x00\x01\x00')
-EEPROM_BATCH_READ_REQUEST = bytearray(b'\x02\x06\x00\x01\x00')
-EEPROM_PRODUCER_READ_REQUEST = bytearray(b'\x02\x07\x00\x01\x00')
+# Single request reading the whole parameter area (addresses 0x01 - 0x07)
+EEPROM_BLOCK_READ_REQUEST = bytearray(b'\x02\x01\x00\x07\x00')
+EEPROM_BLOCK_START = 0x01
+EEPROM_BLOCK_LENGTH = 7
+# Opcode of the EEPROM write request, echoed with the address in the first 2 bytes of the result notification
+EEPROM_WRITE_OPCODE = 0x03
+
+# EEPROM parameter map (name: [address, length in bytes])
+EEPROM_FIELDS = {
+    "ant_id": [0x01, 2],
+    "hw_version": [0x04, 1],
+    "batch": [0x06, 1],
+    "producer": [0x07, 1]
+}
+
+# SAP LOG file columns, also used as columns of the test record store
+LOG_FIELDS = ['Date', 'Time', 'Serial_Number', 'ANT_ID', 'FWVersion', 'HWVersion', 'SW_Testing', 'Batch',
+              'Producer', 'Manufacturer', 'BLE_Addr', 'Result']
+# Indexed columns of the test record store
+RECORD_INDEXES = ['Serial_Number', 'ANT_ID', 'BLE_Addr', 'Batch', 'Date']
+
+# Reflected CRC-16 of the serial numbers: polynomial and table of the CRC of every byte value
+CRC16_POLY = 0x6C49
+CRC16_TABLE = [0] * 256
+for _byte in range(256):
+    _crc = _byte
+    for _bit in range(8):
+        _crc = (_crc >> 1) ^ CRC16_POLY if _crc & 0x0001 else _crc >> 1
+    CRC16_TABLE[_byte] = _crc
+
+# Messages printed in the editor for the problems found in a serial number
+SERIAL_MESSAGES = {
+    "format": ("⚠️ Formato del seriale non valido\n\n", "red"),
+    "device": ("⚠️ Dispositivo non trovato\n\n", "red"),
+    "prefix": ("⚠️ Codice dispositivo riportato nel seriale non valido\n\n", "red"),
+    "length": ("⚠️ Lunghezza del seriale non valida\n\n", "red"),
+    "month": ("⚠️ ATTENZIONE: Mese inserito non attuale\n\n", "orange"),
+    "year": ("⚠️ ATTENZIONE: Anno inserito non attuale\n\n", "orange"),
+    "counter": ("⚠️ Progressivo inserito non valido\n\n", "red"),
+    "crc": ("⚠️ CRC inserito non valido\n\n", "red"),
+    "duplicate": ("⚠️ Seriale ripetuto\n\n", "red")
+}
 
 # External file paths
 toml_file_path = 'settings.toml'
+products_file_path = 'products.toml'
 log_file_path = 'sap_log.txt'
+record_db_file_path = 'test_records.db'
+ant_id_db_file_path = 'ant_id_leases.db'
+gatt_cache_file_path = 'gatt_cache.json'
+eeprom_dump_dir_path = 'eeprom_dump'
+transcript_dir_path = 'transcripts'
 
 # List of valid colours used in Canvas Lib
 ValidColours = ["grey", "green", "red"]
-# List of buttons to check
-symbols = ["Ʌ", "<", "V", ">", "X", "■", "Bottone SX", "Freno SX", "Cambio1 SX", "Cambio2 SX",
-           "Y", "A", "B", "Z", "●", "▲", "Bottone DX", "Freno DX", "Cambio1 DX", "Cambio2 DX"]
-
-# Producer dictionary
-producers = [
-    {
-        "name": "Default",
-        "internal_code": 0
-    },
-    {
-        "name": "Ceis",
-        "internal_code": 1
-    },
-    {
-        "name": "Pimas",
-        "internal_code": 2
-    },
-    {
-        "name": "Dea",
-        "internal_code": 3
-    },
-    {
-        "name": "Elettrodue",
-        "internal_code": 4
-    }
-]
-# Manufacturer dictionary
-manufacturers = [
-    {
-        "name": "Default",
-        "internal_code": 0
-    },
-    {
-        "name": "Brotto",
-        "internal_code": 1
-    },
-    {
-        "name": "Cosmo",
-        "internal_code": 2
-    },
-    {
-        "name": "Elite",
-        "internal_code": 3
-    },
-    {
-        "name": "Clone",
-        "internal_code": 4
-    }
-]
-# Elite devices dictionary
-elite_devices = [
-    {
-        "name": "ARIA",
-        "sn_code": "AI",
-        "sn_length": 13
-    },
-    {
-        "name": "AVANTI",
-        "sn_code": "AV",
-        "sn_length": 13
-    },
-    {
-        "name": "DIRETO XR",
-        "sn_code": "XR",
-        "sn_length": 13
-    },
-    {
-        "name": "DIRETO XR-T",
-        "sn_code": "XR",
-        "sn_length": 13
-    },
-    {
-        "name": "FUORIPISTA",
-        "sn_code": "FP",
-        "sn_length": 13
-    },
-    {
-        "name": "GATEWAY",
-        "sn_code": "GW",
-        "sn_length": 13
-    },
-    {
-        "name": "JUSTO",
-        "sn_code": "JU",
-        "sn_length": 13
-    },
-    {
-        "name": "JUSTO 2",
-        "sn_code": "J2",
-        "sn_length": 13
-    },
-    {
-        "name": "NERO",
-        "sn_code": "NE",
-        "sn_length": 13
-    },
-    {
-        "name": "RIVO",
-        "sn_code": "RV",
-        "sn_length": 13
-    },
-    {
-        "name": "RIZER",
-        "sn_code": "RZ",
-        "sn_length": 13
-    },
-    {
-        "name": "SQUARE",
-        "sn_code": "SQ",
-        "sn_length": 13
-    },
-    {
-        "name": "STERZO SMART",
-        "sn_code": "ST",
-        "sn_length": 13
-    },
-    {
-        "name": "SUITO",
-        "sn_code": "SU",
-        "sn_length": 13
-    },
-    {
-        "name": "SUITO - T",
-        "sn_code": "SU",
-        "sn_length": 13
-    },
-    {
-        "name": "TUO",
-        "sn_code": "TO",
-        "sn_length": 13
-    },
-    {
-        "name": "TURNO",
-        "sn_code": "TU",
-        "sn_length": 13
-    },
-    {
-        "name": "ZONA",
-        "sn_code": "ZN",
-        "sn_length": 7
-    },
-    {
-        "name": "ZUMO",
-        "sn_code": "ZU",
-        "sn_length": 13
-    }
-]
+# Product registry loaded from the products file: internal codes of producers and manufacturers by name, products by
+# name and by serial number prefix
+producer_codes = {}
+manufacturer_codes = {}
+products_by_name = {}
+products_by_code = {}
 
 # Auxiliary variables
-count_buttons_memory = [0] * 22
-button_pressed = [0] * 22
-out_button_pressed = [0] * 20
-iteration = 0
-flag_exit = False
-button_event = Event()
+buttons_previous = None
+buttons_pressed_mask = 0
+button_event = asyncio.Event()
 status_ok = True
 first_test = True
 
@@ -223,38 +159,933 @@ HW_VERSION = 0
 ANT_ID = 0
 RSSI_MIN = 0
 SCAN_TIMEOUT = 0.0
+SCAN_SETTLE_ADV = 0
+SCAN_SETTLE_TIME = 0.0
+BACKGROUND_SCAN = ""
+RSSI_MARGIN = 0.0
+SERVICE_UUID_FILTER = ""
+EXCLUDED_ADDRESSES = frozenset()
+SCAN_MODE = ""
+GATT_CACHE = ""
+EEPROM_TIMEOUT = 0.0
+EEPROM_DUMP = ""
+PIPELINE = ""
+CONSOLE_LINES = 0
+TRANSCRIPT_ARCHIVE = ""
+RECORD_STORE = ""
+STATION_ID = ""
+ANT_ID_BLOCK = 0
+ANT_ID_STORE = ""
+REGISTRY_TTL = 0.0
+REGISTRY_SIZE = 0
+REGISTRY_MIN_ADV = 0
 BLE_TIMEOUT = 0.0
+BLE_RETRIES = 0
+BLE_RETRY_DELAY = 0.0
+BLE_CANDIDATES = 0
 TEST_TIME = 0
 MANUFACTURER = ""
 SETT_FILE_VER = 0.0
 FINAL_TEST = ""
-settings = {}
+config = None
+product = None
+config_signature = None
+config_valid = False
+device_registry = None
+serial_index = None
+record_store = None
+log_writer = None
+ant_id_allocator = None
+ble_worker = None
+ui_dispatcher = None
+gatt_cache = None
+eeprom_pending = deque()
+passive_scan_supported = True
+
+
+#######################################################################################################################
+# CLASSES
+#######################################################################################################################
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """
+    @description: Configuration loaded from the settings.toml file. Each field is published as the module global with
+                  the same name in upper case.
+    """
+    producer: int
+    prod_batch: int
+    target_name: str
+    hw_version: int
+    ant_id: int
+    rssi_min: int
+    rssi_margin: float
+    scan_timeout: float
+    scan_settle_adv: int
+    scan_settle_time: float
+    background_scan: str
+    registry_ttl: float
+    registry_size: int
+    registry_min_adv: int
+    scan_mode: str
+    service_uuid_filter: str
+    excluded_addresses: frozenset
+    ble_timeout: float
+    ble_retries: int
+    ble_retry_delay: float
+    ble_candidates: int
+    gatt_cache: str
+    eeprom_timeout: float
+    eeprom_dump: str
+    pipeline: str
+    console_lines: int
+    transcript_archive: str
+    record_store: str
+    station_id: str
+    ant_id_block: int
+    ant_id_store: str
+    test_time: int
+    manufacturer: str
+    sett_file_ver: float
+    final_test: str
+
+
+@dataclass(frozen=True, slots=True)
+class Product:
+    """
+    @description: Elite product of the product registry. Products without buttons can only be used for serial number
+                  validation. button_bits holds bit 0 of the 4-bit counter of each button in the buttons notification
+                  read as a big endian integer, target_mask their sum.
+    """
+    name: str
+    sn_code: str
+    sn_length: int
+    buttons_char: str = ""
+    control_point: str = ""
+    shutdown_command: bytes = b""
+    payload_length: int = 0
+    buttons: tuple = ()
+    button_bits: tuple = ()
+    target_mask: int = 0
+
+
+@dataclass(slots=True)
+class SerialCheck:
+    """
+    @description: Result of the validation of a serial number. Errors make the serial number invalid, warnings (month
+                  or year code not current) do not. Problems are listed by the keys of SERIAL_MESSAGES.
+    """
+    serial: str
+    errors: list[str]
+    warnings: list[str]
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+
+@dataclass(slots=True)
+class RegistryEntry:
+    """
+    @description: Last known state of a BLE device seen by the background scanner.
+    """
+    device: object
+    adv: object
+    last_seen: float
+    rssi: float
+    count: int
+
+
+class DeviceRegistry:
+    """
+    @description: Thread-safe, bounded registry of the nearby target devices. Every advertisement updates the device
+                  entry (last advertisement, last-seen time and exponentially smoothed RSSI). Entries are kept in
+                  last-seen order, so expired devices are evicted from the head and, when the registry is full, the
+                  least recently seen device is dropped.
+    """
+
+    def __init__(self, ttl: float, max_size: int, alpha: float = RSSI_EWMA_ALPHA) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.alpha = alpha
+        self._entries: OrderedDict[str, RegistryEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, device, adv) -> int:
+        """
+        @description: Records a new advertisement of a device.
+
+        @param device: The BLEDevice that sent the advertisement.
+        @param adv: The advertisement data received.
+
+        @return count: Number of advertisements received from the device since it entered the registry.
+        """
+        if adv.rssi is None:
+            return 0
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(device.address)
+            if entry is None:
+                self._entries[device.address] = RegistryEntry(device, adv, now, float(adv.rssi), 1)
+                if len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                return 1
+            else:
+                entry.device = device
+                entry.adv = adv
+                entry.last_seen = now
+                entry.rssi += self.alpha * (adv.rssi - entry.rssi)
+                entry.count += 1
+                self._entries.move_to_end(device.address)
+                return entry.count
+
+    def evict(self) -> None:
+        """
+        @description: Removes the devices not seen for more than the registry TTL.
+        """
+        deadline = time.monotonic() - self.ttl
+        with self._lock:
+            while self._entries:
+                address, entry = next(iter(self._entries.items()))
+                if entry.last_seen >= deadline:
+                    break
+                del self._entries[address]
+
+    def get_ranking(self, rssi_min: float, min_count: int) -> list[RegistryEntry]:
+        """
+        @description: Returns a snapshot of the live devices with a smoothed RSSI above the threshold, closest first.
+                      Devices are ranked only after enough advertisements, so a single spike cannot make a device
+                      eligible.
+
+        @param rssi_min: Minimum smoothed RSSI in dBm.
+        @param min_count: Minimum number of advertisements received from a device.
+
+        @return ranking: A list of registry entries sorted by smoothed RSSI.
+        """
+        self.evict()
+        with self._lock:
+            ranking = [replace(entry) for entry in self._entries.values()
+                       if entry.rssi >= rssi_min and entry.count >= min_count]
+        ranking.sort(key=lambda x: x.rssi, reverse=True)
+
+        return ranking
+
+    def clear(self) -> None:
+        """
+        @description: Removes every device from the registry.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+class SerialIndex:
+    """
+    @description: Thread-safe in-memory index of the serial numbers recorded in the LOG file. The index is built once
+                  and then kept in sync by reading only the bytes appended since the last refresh, so a duplicate check
+                  costs a set lookup regardless of the LOG size. If the file is replaced or truncated, the index is
+                  rebuilt from scratch.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._serials: set[str] = set()
+        self._offset = 0
+        self._file_id = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """
+        @description: Indexes the complete rows appended to the LOG file since the last refresh, including the rows
+                      written by other processes. A trailing partial row is left for the next refresh.
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset(None)
+                return
+
+            file_id = (stat.st_dev, stat.st_ino)
+            if file_id != self._file_id or stat.st_size < self._offset:
+                self._reset(file_id)
+
+            if stat.st_size == self._offset:
+                return
+
+            with open(self.path, 'rb') as data_file:
+                data_file.seek(self._offset)
+                data = data_file.read()
+
+            # Only complete rows are indexed
+            end = data.rfind(b'\n') + 1
+            rows = data[:end].decode("utf-8", errors="replace").splitlines()
+
+            # The first row of the file is the header
+            if self._offset == 0:
+                rows = rows[1:]
+
+            for row in rows:
+                columns = row.strip().split(";")
+                if len(columns) >= 3:
+                    # SerialNumber column has index 2
+                    self._serials.add(columns[2])
+
+            self._offset += end
+
+    def add(self, serial_number: str) -> None:
+        """
+        @description: Records a serial number before its row reaches the LOG file.
+
+        @param serial_number: The serial number to add.
+        """
+        with self._lock:
+            self._serials.add(serial_number)
+
+    def snapshot(self) -> frozenset:
+        """
+        @description: Returns the serial numbers recorded in the LOG file, refreshing the index first.
+
+        @return serials: The recorded serial numbers.
+        """
+        self.refresh()
+        with self._lock:
+            return frozenset(self._serials)
+
+    def contains(self, serial_number: str) -> bool:
+        """
+        @description: Checks whether a serial number is recorded in the LOG file.
+
+        @param serial_number: The serial number to look up.
+
+        @return bool: True if the serial number is already recorded, False otherwise.
+        """
+        self.refresh()
+        with self._lock:
+            return serial_number in self._serials
+
+    def _reset(self, file_id) -> None:
+        self._serials.clear()
+        self._offset = 0
+        self._file_id = file_id
+
+
+class TestRecordStore:
+    """
+    @description: Embedded SQLite store of every test record, with the same columns of the SAP LOG file and indexes on
+                  serial number, ANT ID, BLE address, batch and date. The database runs in WAL mode, so lookups do not
+                  block the writes of the BLE worker. Values are stored as the text written in the LOG file, so the
+                  exported LOG is byte-compatible with the one written by write_report_log().
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+
+        columns = ", ".join(f'"{field}" TEXT' for field in LOG_FIELDS)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(f"CREATE TABLE IF NOT EXISTS records (id INTEGER PRIMARY KEY, {columns})")
+            for field in RECORD_INDEXES:
+                self._connection.execute(f'CREATE INDEX IF NOT EXISTS idx_{field.lower()} ON records ("{field}")')
+
+    def insert(self, records: list[list]) -> None:
+        """
+        @description: Stores a batch of test records in a single transaction.
+
+        @param records: The records to store, each one with values in LOG_FIELDS order.
+        """
+        columns = ", ".join(f'"{field}"' for field in LOG_FIELDS)
+        placeholders = ", ".join("?" * len(LOG_FIELDS))
+        with self._lock, self._connection:
+            self._connection.executemany(f"INSERT INTO records ({columns}) VALUES ({placeholders})",
+                                         [[str(value) for value in values] for values in records])
+
+    def find(self, field: str, value) -> list[tuple]:
+        """
+        @description: Returns the test records with the given value of an indexed column, oldest first.
+
+        @param field: The column to search, one of RECORD_INDEXES.
+        @param value: The value to look up.
+
+        @return rows: A list of records, with values in LOG_FIELDS order.
+        """
+        if field not in RECORD_INDEXES:
+            raise ValueError(f"Colonna non indicizzata: {field}")
+
+        columns = ", ".join(f'"{name}"' for name in LOG_FIELDS)
+        with self._lock:
+            return self._connection.execute(f'SELECT {columns} FROM records WHERE "{field}" = ? ORDER BY id',
+                                            (str(value),)).fetchall()
+
+    def is_empty(self) -> bool:
+        """
+        @description: Checks whether the store contains no test record.
+
+        @return bool: True if the store is empty, False otherwise.
+        """
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM records LIMIT 1").fetchone() is None
+
+    def import_sap_log(self, log_file: str) -> int:
+        """
+        @description: Loads the rows of an existing SAP LOG file, skipping the header and malformed rows.
+
+        @param log_file: Path to the LOG file.
+
+        @return count: Number of imported records.
+        """
+        with open(log_file, 'r', encoding="utf-8") as data_file:
+            rows = [row.rstrip("\n").split(";") for row in data_file.readlines()[1:]]
+        rows = [row for row in rows if len(row) == len(LOG_FIELDS)]
+
+        columns = ", ".join(f'"{field}"' for field in LOG_FIELDS)
+        placeholders = ", ".join("?" * len(LOG_FIELDS))
+        with self._lock, self._connection:
+            self._connection.executemany(f"INSERT INTO records ({columns}) VALUES ({placeholders})", rows)
+
+        return len(rows)
+
+    def export_sap_log(self, log_file: str) -> int:
+        """
+        @description: Writes every test record to a LOG file in the SAP format (header and semicolon-separated rows),
+                      replacing the file content.
+
+        @param log_file: Path to the LOG file.
+
+        @return count: Number of exported records.
+        """
+        columns = ", ".join(f'"{field}"' for field in LOG_FIELDS)
+        with self._lock:
+            rows = self._connection.execute(f"SELECT {columns} FROM records ORDER BY id").fetchall()
+
+        with open(log_file, 'w') as data_file:
+            data_file.write(';'.join(LOG_FIELDS) + '\n')
+            for row in rows:
+                data_file.write(';'.join(row) + '\n')
+
+        return len(rows)
+
+    def close(self) -> None:
+        """
+        @description: Closes the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+
+class BleWorker:
+    """
+    @description: Long-lived BLE worker. A single thread owns one asyncio event loop for the whole life of the GUI:
+                  test jobs are submitted from the Tk thread through a thread-safe queue and executed one at a time,
+                  while long-running services (e.g. the background scanner) run as tasks on the same loop.
+    """
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._jobs: asyncio.Queue | None = None
+        self._services: set[asyncio.Task] = set()
+        self._current_job: asyncio.Task | None = None
+        self._stopping = False
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ble-worker", daemon=True)
+
+    def start(self) -> None:
+        """
+        @description: Starts the worker thread and waits until it accepts jobs.
+        """
+        self._thread.start()
+        self._ready.wait()
+
+    def submit(self, job) -> None:
+        """
+        @description: Queues a test job. Thread-safe, can be called from the Tk thread.
+
+        @param job: Coroutine function without arguments to execute on the worker loop.
+        """
+        self.loop.call_soon_threadsafe(self._jobs.put_nowait, job)
+
+    def spawn(self, service) -> None:
+        """
+        @description: Starts a long-running service on the worker loop, cancelled at shutdown. Thread-safe.
+
+        @param service: Coroutine function without arguments to run as a task.
+        """
+        self.loop.call_soon_threadsafe(self._start_service, service)
+
+    def stop(self, timeout: float = WORKER_SHUTDOWN_TIMEOUT) -> None:
+        """
+        @description: Discards the queued jobs, cancels the running job and services, lets them close their BLE
+                      connections and waits for the worker thread to end.
+
+        @param timeout: Maximum time in seconds to wait for the worker thread.
+        """
+        if self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self._shutdown)
+            self._thread.join(timeout)
+
+    def _start_service(self, service) -> None:
+        task = self.loop.create_task(service())
+        self._services.add(task)
+        task.add_done_callback(self._services.discard)
+
+    def _shutdown(self) -> None:
+        # Jobs still waiting in the queue are discarded, not started
+        self._stopping = True
+        while not self._jobs.empty():
+            self._jobs.get_nowait()
+
+        for task in (*self._services, self._current_job):
+            if task is not None:
+                task.cancel()
+        self._jobs.put_nowait(None)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    async def _serve(self) -> None:
+        self._jobs = asyncio.Queue()
+        self._ready.set()
+
+        while True:
+            job = await self._jobs.get()
+            if job is None or self._stopping:
+                break
+
+            self._current_job = asyncio.create_task(job())
+            try:
+                await self._current_job
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                # Print to console
+                print(f"❌ Errore durante BleWorker: {e}\n")
+            finally:
+                self._current_job = None
+
+        # Wait for the services to close their resources
+        await asyncio.gather(*self._services, return_exceptions=True)
+
+
+class AntIdAllocator:
+    """
+    @description: Allocator of the ANT IDs shared by the stations of one computer. A small SQLite file, locked while
+                  it is updated, holds the next free ANT ID: each station leases a block of consecutive IDs, hands them
+                  out from memory and appends every consumed ID to a journal, so a restarted station resumes its block
+                  where it stopped and no ID is given to two stations. IDs wrap to 1 after ANT_ID_MAX. The file must be
+                  on a local disk: SQLite locking is not reliable on network folders (SMB/NFS).
+    """
+
+    def __init__(self, path: str, station: str, block_size: int, seed: int) -> None:
+        self.path = path
+        self.station = station
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=ANT_ID_LOCK_TIMEOUT, isolation_level=None,
+                                           check_same_thread=False)
+        self._lease_id = None
+        self._next = 1
+        self._last = 0
+
+        with self._lock, self._immediate():
+            self._connection.execute("CREATE TABLE IF NOT EXISTS counter (id INTEGER PRIMARY KEY, next INTEGER)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS leases (id INTEGER PRIMARY KEY, station TEXT, "
+                                     "first INTEGER, last INTEGER, time TEXT)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS consumed (ant_id INTEGER, lease_id INTEGER, "
+                                     "station TEXT, serial_number TEXT, time TEXT)")
+            # The counter starts from the value of the settings file when the store is new
+            self._connection.execute("INSERT OR IGNORE INTO counter (id, next) VALUES (0, ?)", (seed,))
+
+            # Resume the last block leased to this station
+            lease = self._connection.execute("SELECT id, first, last FROM leases WHERE station = ? "
+                                             "ORDER BY id DESC LIMIT 1", (station,)).fetchone()
+            if lease is not None:
+                consumed = self._connection.execute("SELECT MAX(ant_id) FROM consumed WHERE lease_id = ?",
+                                                    (lease[0],)).fetchone()[0]
+                self._lease_id, self._last = lease[0], lease[2]
+                self._next = lease[1] if consumed is None else consumed + 1
+
+    def peek(self) -> int:
+        """
+        @description: Returns the ANT ID to give to the next device, leasing a new block if the current one is used up.
+
+        @return ant_id: The next ANT ID of this station.
+        """
+        with self._lock:
+            if self._next > self._last:
+                self._lease()
+            return self._next
+
+    def consume(self, serial_number: str) -> int:
+        """
+        @description: Marks the next ANT ID as used by a device and records it in the journal.
+
+        @param serial_number: The serial number of the device that received the ANT ID.
+
+        @return ant_id: The consumed ANT ID.
+        """
+        with self._lock:
+            if self._next > self._last:
+                self._lease()
+
+            ant_id = self._next
+            with self._immediate():
+                self._connection.execute("INSERT INTO consumed VALUES (?, ?, ?, ?, ?)",
+                                         (ant_id, self._lease_id, self.station, serial_number,
+                                          datetime.now().isoformat(timespec="seconds")))
+            self._next += 1
+
+            return ant_id
+
+    def close(self) -> None:
+        """
+        @description: Closes the store connection. The unused IDs of the current block stay leased to this station.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def _lease(self) -> None:
+        with self._immediate():
+            first = self._connection.execute("SELECT next FROM counter WHERE id = 0").fetchone()[0]
+            last = min(first + self.block_size - 1, ANT_ID_MAX)
+            # Wrap to 1 after the highest ANT ID
+            following = 1 if last == ANT_ID_MAX else last + 1
+            self._connection.execute("UPDATE counter SET next = ? WHERE id = 0", (following,))
+            cursor = self._connection.execute("INSERT INTO leases (station, first, last, time) VALUES (?, ?, ?, ?)",
+                                              (self.station, first, last,
+                                               datetime.now().isoformat(timespec="seconds")))
+
+        self._lease_id = cursor.lastrowid
+        self._next = first
+        self._last = last
+
+    @contextlib.contextmanager
+    def _immediate(self):
+        # Hold the write lock of the store for the whole transaction
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+
+class LogWriter:
+    """
+    @description: Background writer of the SAP LOG file. The file stays open for the whole life of the application
+                  and its header is written once, when the file is empty. Records are queued by the BLE worker without
+                  touching the disk; the writer thread collects them for up to LOG_FSYNC_INTERVAL seconds, writes the
+                  batch, syncs it to disk and mirrors it in the test record store. Records that cannot be written are
+                  kept and retried every LOG_RETRY_INTERVAL seconds. Closing the writer flushes every queued record,
+                  retrying up to LOG_CLOSE_RETRIES times.
+    """
+
+    def __init__(self, path: str, store: TestRecordStore | None = None) -> None:
+        self.path = path
+        self.store = store
+        self._queue: queue.Queue = queue.Queue()
+        self._file = None
+        self._synced_size = 0
+        # Records not yet synced to the LOG file / synced but not yet stored in the record store
+        self._pending: list[list] = []
+        self._unstored: list[list] = []
+        self._failed = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+
+    @property
+    def failed(self) -> bool:
+        """
+        @description: True while some records could not be written, until the next successful retry.
+        """
+        return self._failed
+
+    def start(self) -> None:
+        """
+        @description: Starts the writer thread, which opens the LOG file. If the file cannot be opened (e.g. locked by
+                  another program) the error is shown in the editor and the file is opened again at the next retry.
+        """
+        self._thread.start()
+
+    def write(self, values: list) -> None:
+        """
+        @description: Queues a record. Thread-safe, never blocks on the disk.
+
+        @param values: The record values, in LOG_FIELDS order.
+        """
+        self._queue.put(values)
+
+    def close(self, timeout: float = WORKER_SHUTDOWN_TIMEOUT) -> int:
+        """
+        @description: Writes and syncs the queued records, retrying the failed ones up to LOG_CLOSE_RETRIES times,
+                      then closes the LOG file.
+
+        @param timeout: Maximum time in seconds to wait for the writer thread.
+
+        @return unsaved: Number of records not written to the LOG file or not stored in the record store.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+        return len(self._pending) + len(self._unstored) + self._queue.qsize()
+
+    def is_alive(self) -> bool:
+        """
+        @description: True while the writer thread is running (e.g. still blocked on the disk after close()).
+        """
+        return self._thread.is_alive()
+
+    def _open(self) -> None:
+        log_file = open(self.path, 'a')
+        try:
+            size = os.fstat(log_file.fileno()).st_size
+            # Discard the tail of a write that failed after the last sync, it is written again from the pending records
+            if 0 < self._synced_size < size:
+                log_file.truncate(self._synced_size)
+                size = self._synced_size
+            # If file is new or empty, write the header
+            if size == 0:
+                log_file.write(';'.join(LOG_FIELDS) + '\n')
+                log_file.flush()
+                size = log_file.tell()
+        except BaseException:
+            with contextlib.suppress(OSError):
+                log_file.close()
+            raise
+
+        self._file = log_file
+        self._synced_size = size
+
+    def _run(self) -> None:
+        running = True
+        try:
+            # Open the LOG file, through the retry path if it cannot be opened
+            self._write_pending()
+
+            while running:
+                try:
+                    # Failed records are retried even when no new record is queued
+                    batch = [self._queue.get(timeout=LOG_RETRY_INTERVAL if self._failed else None)]
+                except queue.Empty:
+                    self._write_pending()
+                    continue
+                deadline = time.monotonic() + LOG_FSYNC_INTERVAL
+
+                # Collect the records queued within the interval
+                while batch[-1] is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                if batch[-1] is None:
+                    running = False
+                    batch.pop()
+
+                self._pending.extend(batch)
+                self._write_pending()
+
+            # Last attempts before closing, the application is waiting for the flush
+            for _ in range(LOG_CLOSE_RETRIES):
+                if not self._failed:
+                    break
+                time.sleep(LOG_CLOSE_RETRY_DELAY)
+                self._write_pending()
+
+            if self._pending or self._unstored:
+                # Print to console the records that could not be saved, as the last copy left
+                print(f"❌ LogWriter chiuso con {len(self._pending)} record non scritti nel LOG e "
+                      f"{len(self._unstored)} non salvati nel database:")
+                for values in self._pending + self._unstored:
+                    print(';'.join(str(value) for value in values))
+        finally:
+            if self._file is not None:
+                with contextlib.suppress(OSError):
+                    self._file.close()
+
+    def _write_pending(self) -> None:
+        failed = self._failed
+
+        try:
+            if self._file is None:
+                self._open()
+            if self._pending:
+                for values in self._pending:
+                    # Write all values in a single line, separated by a semicolon
+                    self._file.write(';'.join(str(value) for value in values) + '\n')
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._synced_size = self._file.tell()
+                self._unstored.extend(self._pending)
+                self._pending = []
+
+            # Mirror the rows in the test record store
+            if self.store is not None and self._unstored:
+                self.store.insert(self._unstored)
+            self._unstored = []
+            self._failed = False
+
+        except Exception as e:
+            self._failed = True
+            if self._pending and self._file is not None:
+                # Reopened at the next retry, dropping the unsynced tail
+                with contextlib.suppress(OSError):
+                    self._file.close()
+                self._file = None
+            # Print to text editor
+            editor.insert(tk.END, f"❌ Errore durante LogWriter: {e}\n"
+                                  f"{len(self._pending) + len(self._unstored)} record in attesa, nuovo tentativo "
+                                  f"tra {LOG_RETRY_INTERVAL:.0f}s\n\n", "red")
+            set_indicator(canvas2, report_indicator, "red")
+            return
+
+        if failed:
+            # Print to text editor
+            editor.insert(tk.END, "✅ File di LOG di nuovo scrivibile, record in attesa salvati\n\n", "green")
+
+
+class UiDispatcher:
+    """
+    @description: Thread-safe dispatcher of the GUI updates. Any thread posts the changes to a queue, which the Tk main
+                  loop drains every UI_REFRESH_MS milliseconds. Repeated colour updates of the same canvas item within a
+                  frame are merged and only items whose colour actually changed are reconfigured.
+    """
+
+    def __init__(self, window: tk.Tk, interval_ms: int = UI_REFRESH_MS) -> None:
+        self.window = window
+        self.interval_ms = interval_ms
+        self._queue = queue.SimpleQueue()
+        self._item_colours: dict[tuple, str] = {}
+        self.window.after(self.interval_ms, self._drain)
+
+    def post(self, function, *args) -> None:
+        """
+        @description: Queues a call to be executed by the Tk thread, in posting order.
+
+        @param function: The function to call.
+        @param args: The positional arguments of the call.
+        """
+        self._queue.put((function, args))
+
+    def post_item_colour(self, canv: tk.Canvas, item: int, colour: str) -> None:
+        """
+        @description: Queues the fill colour of a canvas item. Only the last colour posted in a frame is applied.
+
+        @param canv: The canvas containing the item.
+        @param item: The item identifier.
+        @param colour: The fill colour.
+        """
+        self._queue.put((None, ((canv, item), colour)))
+
+    def _drain(self) -> None:
+        colours = {}
+
+        try:
+            while True:
+                try:
+                    function, args = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if function is None:
+                    colours[args[0]] = args[1]
+                    continue
+                try:
+                    function(*args)
+                except Exception as e:
+                    # Print to console
+                    print(f"❌ Errore durante UiDispatcher: {e}\n")
+
+            for (canv, item), colour in colours.items():
+                if self._item_colours.get((canv, item)) == colour:
+                    continue
+                try:
+                    canv.itemconfig(item, fill=colour)
+                    self._item_colours[(canv, item)] = colour
+                except Exception as e:
+                    # Print to console
+                    print(f"❌ Errore durante UiDispatcher: {e}\n")
+
+        finally:
+            # The next frame is always scheduled, so one failed update never stops the GUI updates
+            self.window.after(self.interval_ms, self._drain)
+
+
+class DispatchedEditor:
+    """
+    @description: Proxy of the editor widget that can be used from any thread: insert() and delete() are posted to the
+                  UI dispatcher and executed by the Tk thread in order. The widget is a bounded ring of lines: when it
+                  exceeds CONSOLE_LINES the oldest lines are removed in steps of CONSOLE_TRIM_STEP. The complete text of
+                  the current test is kept in a transcript, to be archived on disk at the end of the test.
+    """
+
+    def __init__(self, widget: ScrolledText, dispatcher: UiDispatcher) -> None:
+        self.widget = widget
+        self.dispatcher = dispatcher
+        self._transcript: list[str] = []
+
+    def insert(self, index, text: str, *tags) -> None:
+        self._transcript.append(text)
+        self.dispatcher.post(self._insert, index, text, *tags)
+
+    def start_transcript(self) -> None:
+        """
+        @description: Starts the transcript of a new test.
+        """
+        self._transcript = []
+
+    def take_transcript(self) -> str:
+        """
+        @description: Returns the transcript of the current test and starts a new one.
+
+        @return transcript: The text inserted in the editor since the start of the transcript.
+        """
+        transcript, self._transcript = self._transcript, []
+        return "".join(transcript)
+
+    def _insert(self, index, text: str, *tags) -> None:
+        self.widget.insert(index, text, *tags)
+
+        # Remove the oldest lines (index of the last line = number of lines)
+        lines = int(self.widget.index("end-1c").split(".")[0])
+        if lines > CONSOLE_LINES + CONSOLE_TRIM_STEP:
+            self.widget.delete("1.0", f"{lines - CONSOLE_LINES + 1}.0")
+
+    def delete(self, index1, index2=None) -> None:
+        self.dispatcher.post(self.widget.delete, index1, index2)
 
 
 #######################################################################################################################
 # FUNCTIONS
 #######################################################################################################################
 
-def get_crc_16(data: bytes) -> int:
+def get_crc_16(data: bytes, crc: int = 0) -> int:
     """
-    @description: Calculates the CRC-16 checksum for a given byte sequence.
+    @description: Calculates the CRC-16 checksum for a given byte sequence, using the table of the CRC of every byte
+                  value. Passing the CRC of a prefix continues the calculation after it.
 
     @param data: The input data to process, provided as a sequence of bytes.
+    @param crc: The CRC of the data preceding the sequence, 0 to start a new calculation.
 
     @return crc: The computed CRC-16 value as an integer.
     """
     global editor
-    crc = 0
 
     try:
-        # Calculate CRC value
+        # Calculate CRC value, one byte at a time
         for i in data:
-            crc ^= i
-            for j in range(8):
-                if crc & 0x0001:
-                    crc = (crc >> 1) ^ 0x6C49
-                else:
-                    crc = crc >> 1
+            crc = (crc >> 8) ^ CRC16_TABLE[(crc ^ i) & 0xFF]
 
         # Return calculated CRC value
         return crc
@@ -290,14 +1121,16 @@ def create_gui() -> None:
     @description: Initializes and displays the main graphical user interface for the testing application. It creates
                   input fields, fixed labels, test indicators, action buttons, and the editor panel.
     """
-    global root, frame_sx, frame_editor, frame_buttons, saved_label_row, editor, entry, start_button, restart_button
-    global label3, buttons_indicator, report_indicator, canvas, canvas2, FINAL_TEST
+    global root, frame_sx, frame_editor, frame_buttons, editor, entry, start_button, restart_button
+    global label3, buttons_indicator, report_indicator, canvas, canvas2, FINAL_TEST, ui_dispatcher
+    global buttons_grid, buttons_items
 
     # Variable to count the number of the written editor rows
     row = 0
-    saved_label_row = 0
     try:
         root = create_new_windows(str(TARGET_NAME))
+        # GUI updates from every thread go through the dispatcher
+        ui_dispatcher = UiDispatcher(root)
         # Frame sx
         frame_sx = create_frame_base(root, 300, 700, 0, 0, "ne")
         # Frame edit
@@ -319,14 +1152,10 @@ def create_gui() -> None:
         # Inc row index
         row += 1
 
-        # Saved labels row
-        saved_label_row = row
-
-        for z in range(10):
-            create_fixed_output(frame_sx, symbols[z], row, 0)
-            create_fixed_output(frame_sx, symbols[z+10], row, 1)
-            # Inc row index
-            row += 1
+        # Buttons grid, created once and reset in place at every new test
+        buttons_grid, buttons_items = create_buttons_grid(frame_sx, row, 0)
+        # Inc row index
+        row += (len(product.buttons) + 1) // 2
 
         # Indicators
         canvas = create_report(frame_sx, "Collaudo pulsanti", row, 0, frame_sx, 100, 100, row, 1)
@@ -346,7 +1175,8 @@ def create_gui() -> None:
         restart_button = create_new_button(frame_buttons, "Nuovo collaudo", 12, 3, restart, 300, 100)
 
         # Editor
-        editor = create_custom_editor(frame_editor, TARGET_NAME, SW_TESTING_VERSION, str(SETT_FILE_VER))
+        editor = DispatchedEditor(create_custom_editor(frame_editor, TARGET_NAME, SW_TESTING_VERSION,
+                                                       str(SETT_FILE_VER)), ui_dispatcher)
 
     except Exception as e:
         # Print to text editor
@@ -359,30 +1189,45 @@ def main() -> None:
                   button labels, and starts the main event loop. If the configuration file is invalid or missing, it
                   outputs a failure message in the editor.
     """
-    global labels, frame_sx, saved_label_row, root, status_ok, editor
+    global root, status_ok, editor, device_registry, serial_index, record_store, log_writer, ble_worker, product
 
     try:
-        # Import data from file and check input values
-        status_ok = import_data_file(toml_file_path)
+        # Import the product registry and data from file and check input values
+        status_ok = load_product_registry(products_file_path) and import_data_file(toml_file_path)
 
         if status_ok:
+            # Product under test for the whole session
+            product = products_by_name[TARGET_NAME]
+
             # Create a new GUI
             create_gui()
 
-            # Editing buttons label values
-            labels = []
-            for i in range(20):
-                # Determines the column (0 for first 10, 1 for the rest)
-                label_col = i // 10
-                label_row = saved_label_row + (i % 10)
-                label = tk.Label(frame_sx, text="", font=("Arial", 16, "bold"), width=20)
-                label.grid(row=label_row, column=label_col, padx=1, pady=1)
-                labels.append(label)
-
             # Initial update of labels with a list of zeros
-            update_labels([0] * 20)
+            update_labels([0] * len(product.buttons))
             set_labels_name()
 
+            # Index the serial numbers already recorded in the LOG file
+            serial_index = SerialIndex(log_file_path)
+            serial_index.refresh()
+
+            # Open the test record store, loading the existing LOG file the first time
+            if RECORD_STORE == "true":
+                record_store = open_record_store(record_db_file_path, log_file_path)
+
+            # LOG file writer, kept open until the application is closed
+            log_writer = LogWriter(log_file_path, record_store)
+            log_writer.start()
+
+            # Single BLE worker used by every test
+            ble_worker = BleWorker()
+            ble_worker.start()
+            root.protocol("WM_DELETE_WINDOW", close_application)
+
+            # Keep the registry of the nearby devices updated while the application is running
+            device_registry = DeviceRegistry(REGISTRY_TTL, REGISTRY_SIZE)
+            if BACKGROUND_SCAN == "true":
+                ble_worker.spawn(background_scan)
+
             root.mainloop()
         else:
             editor.insert(tk.END, "❌ Fine - Collaudo NON SUPERATO!\n", "red")
@@ -407,77 +1252,228 @@ def get_application_path():
 
 def import_data_file(file_path) -> bool:
     """
-    @description: Loads device and test configuration data from a TOML file and populates global settings.
-                  Performs input validation after extraction.
+    @description: Loads device and test configuration data from a TOML file and populates global settings. The file
+                  is parsed and validated again only when its modification time or size changes; otherwise the cached
+                  configuration is published again, restoring the values changed by the previous test.
 
     @param file_path: Path to the TOML configuration file.
 
     @return result: True if data have been imported correctly, False otherwise
     """
-    global PRODUCER, PROD_BATCH, TARGET_NAME, HW_VERSION
-    global ANT_ID, RSSI_MIN, SCAN_TIMEOUT, BLE_TIMEOUT, TEST_TIME, MANUFACTURER, SETT_FILE_VER, FINAL_TEST
-    global settings, editor
-
-    result = True
-    producer_found = False
-    manufacturer_found = False
+    global config, config_signature, config_valid, editor
 
     try:
         # TOML file complete path
         config_path = os.path.join(get_application_path(), file_path)
 
-        # Load the TOML file
-        with open(config_path, "rb") as file:
-            settings = tomli.load(file)
+        stat = os.stat(config_path)
+        signature = (config_path, stat.st_mtime_ns, stat.st_size)
 
-        # Search producer in producers dictionary
-        for producer in producers:
-            if producer["name"] == str(settings['BOARD']['producer']).capitalize():
-                PRODUCER = producer["internal_code"]
-                producer_found = True
+        if signature != config_signature:
+            config = load_config(config_path)
+            config_signature = signature
 
-        # Search manufacturer in producers dictionary
-        for manufacturer in manufacturers:
-            if manufacturer["name"] == str(settings['DEVICE']['manufacturer']).capitalize():
-                MANUFACTURER = str(settings['DEVICE']['manufacturer']).capitalize()
-                manufacturer_found = True
+            if config is None:
+                config_valid = False
+            else:
+                apply_config(config)
+                # Check input values
+                config_valid = check_input()
 
-        if not producer_found:
-            editor.insert(tk.END, f"❌ PRODUCER non inserito nella lista!\n", "red")
-            result = False
-        elif not manufacturer_found:
-            editor.insert(tk.END, f"❌ MANUFACTURER non inserito nella lista!\n", "red")
-            result = False
+        elif config_valid:
+            apply_config(config)
         else:
-            PROD_BATCH = settings['BOARD']['batch']
-            TARGET_NAME = str(settings['DEVICE']['type']).upper()
-            HW_VERSION = settings['DEVICE']['hw_version']
-            ANT_ID = settings['VARIABLES']['ant_id_cnt']
-            RSSI_MIN = settings['VARIABLES']['rssi_ths']
-            SCAN_TIMEOUT = settings['VARIABLES']['scan_time']
-            BLE_TIMEOUT = settings['VARIABLES']['ble_time']
-            TEST_TIME = settings['VARIABLES']['time_to_press_buttons']
-            SETT_FILE_VER = settings['VARIABLES']['file_ver']
-            FINAL_TEST = str(settings['VARIABLES']['final_test']).lower()
-
-            # Check input values
-            if not check_input():
-                result = False
+            editor.insert(tk.END, f"❌ File {file_path} non valido, correggere e salvare il file!\n", "red")
 
-        return result
+        return config_valid
 
     except Exception as e:
+        config_signature = None
         editor.insert(tk.END, f"❌ Errore durante import_data_file(): {e}\n\n")
         return False
 
 
+def load_product_registry(file_path) -> bool:
+    """
+    @description: Loads the producers, the manufacturers and the Elite products from the products file and indexes
+                  them by name (products also by serial number prefix). For the testable products the bits of the
+                  buttons in the notification are computed once here.
+
+    @param file_path: Path to the TOML products file.
+
+    @return result: True if the registry has been loaded correctly, False otherwise
+    """
+    global editor
+
+    try:
+        read_product_registry(file_path)
+        return True
+
+    except Exception as e:
+        editor.insert(tk.END, f"❌ Errore durante load_product_registry(): {e}\n\n")
+        return False
+
+
+def read_product_registry(file_path) -> None:
+    """
+    @description: Reads the products file and builds the lookups of the product registry. Errors are raised to the
+                  caller.
+
+    @param file_path: Path to the TOML products file.
+    """
+    global producer_codes, manufacturer_codes, products_by_name, products_by_code
+
+    # Load the TOML file
+    with open(os.path.join(get_application_path(), file_path), "rb") as file:
+        data = tomli.load(file)
+
+    producer_codes = {item["name"]: item["internal_code"] for item in data["producers"]}
+    manufacturer_codes = {item["name"]: item["internal_code"] for item in data["manufacturers"]}
+
+    products_by_name = {}
+    products_by_code = {}
+    for item in data["products"]:
+        test = item.get("test", {})
+        buttons = tuple(test.get("buttons", ()))
+        payload_length = test.get("payload_length", 0)
+        offset = test.get("buttons_offset", 0)
+
+        # Each byte of the notification holds two counters
+        if offset + len(buttons) > 2 * payload_length:
+            raise ValueError(f"layout della notifica pulsanti di {item['name']} non valido")
+        button_bits = tuple(1 << (4 * (2 * payload_length - 1 - offset - j)) for j in range(len(buttons)))
+
+        entry = Product(name=str(item["name"]).upper(), sn_code=str(item["sn_code"]).upper(),
+                        sn_length=int(item["sn_length"]), buttons_char=test.get("buttons_char", ""),
+                        control_point=test.get("control_point", ""),
+                        shutdown_command=bytes(test.get("shutdown_command", [])), payload_length=payload_length,
+                        buttons=buttons, button_bits=button_bits, target_mask=sum(button_bits))
+
+        products_by_name[entry.name] = entry
+        # Different products can share the same serial number prefix
+        products_by_code.setdefault(entry.sn_code, []).append(entry)
+
+
+def load_config(config_path: str) -> Config | None:
+    """
+    @description: Parses the TOML configuration file and builds the configuration object. Producer and manufacturer
+                  names are resolved through the lookups by name.
+
+    @param config_path: Complete path to the TOML configuration file.
+
+    @return config: The loaded configuration, or None if producer or manufacturer are not in the lists.
+    """
+    # Load the TOML file
+    with open(config_path, "rb") as file:
+        settings = tomli.load(file)
+
+    producer = producer_codes.get(str(settings['BOARD']['producer']).capitalize())
+    manufacturer = str(settings['DEVICE']['manufacturer']).capitalize()
+
+    if producer is None:
+        editor.insert(tk.END, f"❌ PRODUCER non inserito nella lista!\n", "red")
+        return None
+    if manufacturer not in manufacturer_codes:
+        editor.insert(tk.END, f"❌ MANUFACTURER non inserito nella lista!\n", "red")
+        return None
+
+    variables = settings['VARIABLES']
+
+    return Config(
+        producer=producer,
+        prod_batch=settings['BOARD']['batch'],
+        target_name=str(settings['DEVICE']['type']).upper(),
+        hw_version=settings['DEVICE']['hw_version'],
+        ant_id=variables['ant_id_cnt'],
+        rssi_min=variables['rssi_ths'],
+        rssi_margin=variables.get('rssi_margin', 0.0),
+        scan_timeout=variables['scan_time'],
+        scan_settle_adv=variables.get('scan_settle_adv', 0),
+        scan_settle_time=variables.get('scan_settle_time', 0.0),
+        background_scan=str(variables.get('background_scan', "true")).lower(),
+        registry_ttl=variables.get('registry_ttl', 3.0),
+        registry_size=variables.get('registry_size', 64),
+        registry_min_adv=variables.get('registry_min_adv', 3),
+        scan_mode=str(variables.get('scan_mode', "active")).lower(),
+        service_uuid_filter=str(variables.get('service_uuid_filter', "false")).lower(),
+        excluded_addresses=frozenset(str(address).upper() for address in variables.get('excluded_addresses', [])),
+        ble_timeout=variables['ble_time'],
+        ble_retries=variables.get('ble_retries', 2),
+        ble_retry_delay=variables.get('ble_retry_delay', 0.5),
+        ble_candidates=variables.get('ble_candidates', 1),
+        gatt_cache=str(variables.get('gatt_cache', "true")).lower(),
+        eeprom_timeout=variables.get('eeprom_time', 3.0),
+        eeprom_dump=str(variables.get('eeprom_dump', "true")).lower(),
+        pipeline=str(variables.get('pipeline', "true")).lower(),
+        console_lines=variables.get('console_lines', 2000),
+        transcript_archive=str(variables.get('transcript_archive', "true")).lower(),
+        record_store=str(variables.get('record_store', "true")).lower(),
+        station_id=str(variables.get('station_id', socket.gethostname())),
+        ant_id_block=variables.get('ant_id_block', 16),
+        ant_id_store=str(variables.get('ant_id_store', ant_id_db_file_path)),
+        test_time=variables['time_to_press_buttons'],
+        manufacturer=manufacturer,
+        sett_file_ver=variables['file_ver'],
+        final_test=str(variables['final_test']).lower()
+    )
+
+
+def apply_config(cfg: Config) -> None:
+    """
+    @description: Publishes every field of the configuration as the module global with the same name in upper case.
+
+    @param cfg: The configuration to publish.
+    """
+    global PRODUCER, PROD_BATCH, TARGET_NAME, HW_VERSION, ANT_ID, RSSI_MIN, RSSI_MARGIN, SCAN_TIMEOUT, SCAN_SETTLE_ADV
+    global SCAN_SETTLE_TIME, BACKGROUND_SCAN, REGISTRY_TTL, REGISTRY_SIZE, REGISTRY_MIN_ADV, SCAN_MODE
+    global SERVICE_UUID_FILTER, EXCLUDED_ADDRESSES, BLE_TIMEOUT, BLE_RETRIES, BLE_RETRY_DELAY, BLE_CANDIDATES
+    global GATT_CACHE, EEPROM_TIMEOUT, EEPROM_DUMP, PIPELINE, CONSOLE_LINES, TRANSCRIPT_ARCHIVE, RECORD_STORE
+    global STATION_ID, ANT_ID_BLOCK, ANT_ID_STORE, TEST_TIME, MANUFACTURER, SETT_FILE_VER, FINAL_TEST
+
+    PRODUCER = cfg.producer
+    PROD_BATCH = cfg.prod_batch
+    TARGET_NAME = cfg.target_name
+    HW_VERSION = cfg.hw_version
+    ANT_ID = cfg.ant_id
+    RSSI_MIN = cfg.rssi_min
+    RSSI_MARGIN = cfg.rssi_margin
+    SCAN_TIMEOUT = cfg.scan_timeout
+    SCAN_SETTLE_ADV = cfg.scan_settle_adv
+    SCAN_SETTLE_TIME = cfg.scan_settle_time
+    BACKGROUND_SCAN = cfg.background_scan
+    REGISTRY_TTL = cfg.registry_ttl
+    REGISTRY_SIZE = cfg.registry_size
+    REGISTRY_MIN_ADV = cfg.registry_min_adv
+    SCAN_MODE = cfg.scan_mode
+    SERVICE_UUID_FILTER = cfg.service_uuid_filter
+    EXCLUDED_ADDRESSES = cfg.excluded_addresses
+    BLE_TIMEOUT = cfg.ble_timeout
+    BLE_RETRIES = cfg.ble_retries
+    BLE_RETRY_DELAY = cfg.ble_retry_delay
+    BLE_CANDIDATES = cfg.ble_candidates
+    GATT_CACHE = cfg.gatt_cache
+    EEPROM_TIMEOUT = cfg.eeprom_timeout
+    EEPROM_DUMP = cfg.eeprom_dump
+    PIPELINE = cfg.pipeline
+    CONSOLE_LINES = cfg.console_lines
+    TRANSCRIPT_ARCHIVE = cfg.transcript_archive
+    RECORD_STORE = cfg.record_store
+    STATION_ID = cfg.station_id
+    ANT_ID_BLOCK = cfg.ant_id_block
+    ANT_ID_STORE = cfg.ant_id_store
+    TEST_TIME = cfg.test_time
+    MANUFACTURER = cfg.manufacturer
+    SETT_FILE_VER = cfg.sett_file_ver
+    FINAL_TEST = cfg.final_test
+
+
 def check_input() -> bool:
     """
     @description: Validates configuration values loaded from the TOML file, including board and device parameters.
                   Prints specific error messages to the editor and updates global status if any values are invalid.
     @return result: True if imported data are right, False otherwise
     """
-    global PRODUCER, PROD_BATCH, HW_VERSION, ANT_ID
+    global PRODUCER, PROD_BATCH, HW_VERSION, ANT_ID, SCAN_SETTLE_ADV, SCAN_SETTLE_TIME, REGISTRY_TTL, REGISTRY_SIZE
     global editor
 
     result = True
@@ -499,6 +1495,46 @@ def check_input() -> bool:
             # Print to text editor
             editor.insert(tk.END, f"❌ Valore di ANT_ID inserito non valido!\n", "red")
             result = False
+        if SCAN_SETTLE_ADV < 0 or not 0 <= SCAN_SETTLE_TIME <= SCAN_TIMEOUT:
+            # Print to text editor
+            editor.insert(tk.END, f"❌ Valori di SCAN_SETTLE inseriti non validi!\n", "red")
+            result = False
+        if SCAN_MODE not in ("active", "passive"):
+            # Print to text editor
+            editor.insert(tk.END, f"❌ Valore di SCAN_MODE inserito non valido!\n", "red")
+            result = False
+        if not RSSI_MARGIN >= 0:
+            # Print to text editor
+            editor.insert(tk.END, f"❌ Valore di RSSI_MARGIN inserito non valido!\n", "red")
+            result = False
+        if not BLE_RETRIES >= 0 or not BLE_RETRY_DELAY >= 0 or not BLE_CANDIDATES >= 1:
+            # Print to text editor
+            editor.insert(tk.END, f"❌ Valori di BLE_RETRIES/RETRY_DELAY/CANDIDATES inseriti non validi!\n", "red")
+            result = False
+        if not CONSOLE_LINES >= 100:
+            # Print to text editor
+            editor.insert(tk.END, f"❌ Valore di CONSOLE_LINES inserito non valido!\n", "red")
+            result = False
+        if not EEPROM_TIMEOUT > 0:
+            # Print to text editor
+            editor.insert(tk.END, f"❌ Valore di EEPROM_TIMEOUT inserito non valido!\n", "red")
+            result = False
+        if TARGET_NAME not in products_by_name or not products_by_name[TARGET_NAME].buttons:
+            # Print to text editor
+            editor.insert(tk.END, f"❌ DEVICE type {TARGET_NAME} non collaudabile!\n", "red")
+            result = False
+        elif product is not None and product.name != TARGET_NAME:
+            # Print to text editor
+            editor.insert(tk.END, f"❌ DEVICE type cambiato in {TARGET_NAME}: riavviare l'applicazione!\n", "red")
+            result = False
+        if not 1 <= ANT_ID_BLOCK <= ANT_ID_MAX:
+            # Print to text editor
+            editor.insert(tk.END, f"❌ Valore di ANT_ID_BLOCK inserito non valido!\n", "red")
+            result = False
+        if not REGISTRY_TTL > 0 or not REGISTRY_SIZE >= 1 or not REGISTRY_MIN_ADV >= 1:
+            # Print to text editor
+            editor.insert(tk.END, f"❌ Valori di REGISTRY inseriti non validi!\n", "red")
+            result = False
 
         return result
 
@@ -539,50 +1575,20 @@ def get_month_code() -> list:
         editor.insert(tk.END, f"❌ Errore durante get_month_code(): {e}\n\n", "red")
 
 
-def number_to_2_bytes(num) -> bytearray | None:
-    """
-    @description: Converts an integer value into a 2-byte little-endian bytearray. If the input is out of bounds, it
-                  prints an error message to the GUI editor.
-
-    @param num: The integer value to convert (must be between 0 and 65535).
-
-    @return bytearray: A 2-byte bytearray representation of the input number, or None if the value is out of range.
-    """
-    global editor
-
-    try:
-        # Ensure the number is between 0 and 65535
-        if not (0 <= num <= 65535):
-            # Print to text editor
-            editor.insert(tk.END, "Il valore deve essere compreso tra 0 e 65535\n\n")
-            return
-
-        # Convert the number to 2 bytes (little-endian)
-        byte_array = num.to_bytes(2, byteorder='little')
-
-        return byte_array
-
-    except Exception as e:
-        # Print to text editor
-        editor.insert(tk.END, f"❌ Errore durante number_to_2_bytes(): {e}\n\n", "red")
-
-
 def update_labels(array) -> None:
     """
-    @description: Updates the color of each button label in the GUI based on its status value. Labels are colored green
-                  if active (value > 0), red if inactive.
+    @description: Updates the color of each button of the buttons grid based on its status value. Buttons are colored
+                  green if active (value > 0), red if inactive. The colours are posted to the UI dispatcher, so the
+                  function can be called from the BLE worker.
 
-    @param array: A list of 20 integer values representing button states. Each element controls the foreground color of
-                  its corresponding label.
+    @param array: A list of integer values representing button states, one for each button of the product. Each
+                  element controls the fill color of its corresponding button.
     """
-    global labels
+    global buttons_grid, buttons_items
 
     try:
-        for j in range(20):
-            if array[j] > 0:
-                labels[j].config(fg="green")
-            else:
-                labels[j].config(fg="red")
+        for item, value in zip(buttons_items, array):
+            ui_dispatcher.post_item_colour(buttons_grid, item, "green" if value > 0 else "red")
 
     except Exception as e:
         # Print to text editor
@@ -591,14 +1597,15 @@ def update_labels(array) -> None:
 
 def set_labels_name() -> None:
     """
-    @description: Assigns text and color styling to each button label in the GUI. Labels are updated with their
+    @description: Assigns text and color styling to each button of the buttons grid. Buttons are updated with their
                   corresponding symbol names and set to red color by default.
     """
-    global labels
+    global buttons_grid, buttons_items
 
     try:
-        for k in range(20):
-            labels[k].config(text=symbols[k], fg="red")
+        for item, text in zip(buttons_items, product.buttons):
+            buttons_grid.itemconfig(item, text=text)
+            ui_dispatcher.post_item_colour(buttons_grid, item, "red")
 
     except Exception as e:
         # Print to text editor
@@ -607,78 +1614,88 @@ def set_labels_name() -> None:
 
 def notification_handler(sender, data) -> None:
     """
-    @description: Handles incoming BLE notifications by decoding 4-bit button states, comparing them with previous
-                  readings, updating global press tracking, and triggering an event if all required buttons are detected
-                  as pressed. Also manages exit/reset behavior for repeated test sessions.
+    @description: Handles incoming BLE notifications by comparing the 4-bit button counters with the previous reading.
+                  The payload is read as a single integer: the XOR with the previous one, collapsed on bit 0 of every
+                  counter, gives the buttons whose counter changed, which are accumulated in a pressed bitmask. The
+                  event is triggered when the bitmask equals the target mask of all required buttons. Notifications
+                  identical to the previous one are skipped.
 
     @param sender: The BLE device or service that sent the notification.
     @param data: A bytearray containing button status encoded in 4-bit values.
     """
-    global count_buttons_memory, button_pressed, out_button_pressed, iteration, editor, flag_exit
+    global buttons_previous, buttons_pressed_mask, editor
 
-    print(f"Received data from {sender}: {data}")
-    print(f"Notification from {sender}: {data}")
+    try:
+        value = int.from_bytes(data, byteorder='big')
+
+        # Nothing changed since the previous notification
+        if value == buttons_previous:
+            return
+        if len(data) != product.payload_length:
+            # Print to text editor
+            editor.insert(tk.END, f"⚠️ Notifica pulsanti di lunghezza non valida: {len(data)} byte\n", "orange")
+            return
 
-    # Initialize an empty list to store the split 4-bit values
-    count_buttons = []
+        # The first notification is the reference of the counters
+        if buttons_previous is not None:
+            diff = value ^ buttons_previous
+            changed = (diff | diff >> 1 | diff >> 2 | diff >> 3) & product.target_mask
 
-    try:
-        # Reset of variables if an exit request from thread is appeared
-        if flag_exit:
-            flag_exit = False
-            count_buttons_memory = [0] * 22
-            button_pressed = [0] * 22
-            out_button_pressed = [0] * 20
-            iteration = 0
-
-        # Loop through each byte in the bytearray
-        for byte in data:
-            # Extract the higher 4 bits by right-shifting by 4 and store in the list
-            high_nibble = ((byte >> 4) & 0x0F)
-            count_buttons.append(high_nibble)
-
-            # Extract the lower 4 bits by ANDing with 0x0F and store in the list
-            low_nibble = (byte & 0x0F)
-            count_buttons.append(low_nibble)
-
-        # Output the result list
-        if iteration > 0:
-            result = [abs(a - b) for a, b in zip(count_buttons, count_buttons_memory)]
-            button_pressed = [x + y for x, y in zip(button_pressed, result)]
-
-            # Format the array
-            for a in range(len(button_pressed)):
-                if button_pressed[a] > 1:
-                    button_pressed[a] = 1
-
-            out_button_pressed = button_pressed[2:]
-            update_labels(out_button_pressed)
-
-            # Check if all buttons are pressed
-            if all(element == 1 for element in out_button_pressed):
-                # Flag to request the exit from thread
-                flag_exit = True
-                # Signal that all buttons are pressed
-                button_event.set()
-
-        iteration += 1
-        count_buttons_memory = count_buttons.copy()
+            if changed & ~buttons_pressed_mask:
+                buttons_pressed_mask |= changed
+                update_labels([1 if buttons_pressed_mask & bit else 0 for bit in product.button_bits])
+
+                # Check if all buttons are pressed
+                if buttons_pressed_mask == product.target_mask:
+                    # Signal that all buttons are pressed
+                    button_event.set()
+
+        buttons_previous = value
 
     except Exception as e:
         # Print to text editor
         editor.insert(tk.END, f"❌ Errore durante notification_handler(): {e}\n\n", "red")
 
 
+def reset_button_state() -> None:
+    """
+    @description: Resets the button state engine before a new button test session.
+    """
+    global buttons_previous, buttons_pressed_mask
+
+    buttons_previous = None
+    buttons_pressed_mask = 0
+    button_event.clear()
+
+
 def notification_eeprom(sender, data) -> None:
     """
-    @description: Handles incoming BLE notifications related to EEPROM operations. Prints the raw data received along
-                  with the sender's identifier for debugging purposes.
+    @description: Handles incoming BLE notifications related to EEPROM operations. Each result notification echoes the
+                  opcode and the address of its request and completes the oldest pending request with the same opcode
+                  and address. The rest of the payload is not interpreted: the written data are always verified by
+                  reading the EEPROM back. Notifications of requests no longer pending (e.g. arrived after the
+                  timeout) are discarded.
 
     @param sender: The BLE device or service that transmitted the EEPROM data.
     @param data: A bytearray containing the EEPROM payload received.
     """
+    global eeprom_pending
+
     try:
-        print(f"Dati ricevuti da {sender}: {data}\n")
+        if len(data) < 2:
+            # Print to text editor
+            editor.insert(tk.END, f"⚠️ Notifica EEPROM di lunghezza non valida: {len(data)} byte\n", "orange")
+            return
+
+        for request in eeprom_pending:
+            opcode, address, future = request
+            if opcode == data[0] and address == data[1] and not future.done():
+                eeprom_pending.remove(request)
+                future.set_result(None)
+                return
+
+        # Print to text editor
+        editor.insert(tk.END, f"⚠️ Notifica EEPROM non attesa ignorata: {bytes(data).hex(' ')}\n", "orange")
 
     except Exception as e:
         # Print to text editor
@@ -687,39 +1704,23 @@ def notification_eeprom(sender, data) -> None:
 
 def check_presence_serial(serial_number, log_file=log_file_path) -> bool:
     """
-    @description: Checks whether a given serial number is already present in the specified log file. Iterates through
-                  the file entries and compares serial number values to prevent duplicates.
+    @description: Checks whether a given serial number is already present in the specified log file. The lookup uses
+                  the in-memory serial index, which only reads the rows appended since the previous check.
 
     @param serial_number: The serial number to verify.
     @param log_file: Path to the log file that contains historical serial numbers.
 
     @return bool: True if the serial number is not found (i.e., it's new), False if already present.
     """
-    global editor
+    global editor, serial_index
 
     try:
-        # Open LOG file to check all SerialNumber values
-        with open(log_file, 'r', encoding="utf-8") as data_file:
-            rows = data_file.readlines()
-
-        # List of SerialNumber in LOF file
-        sn_column = []
-
-        # Extract the SerialNumber value from each LOG file row
-        for p in rows[1:]:
-            columns = p.strip().split(";")
-            if len(columns) >= 3:
-                # SerialNumber column has index 2
-                sn_column.append(columns[2])
-
-        # Scroll all values in LOG
-        for value in sn_column:
-            if value == serial_number:
-                # Exit to function
-                return False
+        # Build the index of the LOG file on first use
+        if serial_index is None or serial_index.path != log_file:
+            serial_index = SerialIndex(log_file)
 
-        # SerialNumber is new value
-        return True
+        # SerialNumber is new value if not in the index
+        return not serial_index.contains(serial_number)
 
     except Exception as e:
         # Print to text editor
@@ -736,60 +1737,17 @@ def is_valid_serial(serial: str) -> bool:
 
     @return result: True if the serial number is valid according to the specified rules, False otherwise.
     """
-    global editor, elite_devices, TARGET_NAME
+    global editor, TARGET_NAME
 
     try:
-        result = True
-        dev_found = False
-        serial_num_code = ""
-        serial_num_length = 0
-
-        # List for date
-        date = get_month_code()
-
-        # Extraction of SerialNumber fields
-        mounth = str(serial[2])
-        year = int(serial[3:5])
-        counter = int(serial[5:9])
-        crc = int(serial[9:13], 16)
-        input_data = serial[0:9]
-        calculated_crc = crc16_from_str(input_data)
-
-        # Search desired device in elite devices dictionary
-        for device in elite_devices:
-            if device["name"].upper() == TARGET_NAME:
-                # Extract value of desired device
-                serial_num_code = str(device["sn_code"]).upper()
-                serial_num_length = int(device["sn_length"])
-                dev_found = True
-
-        if not dev_found:
-            editor.insert(tk.END, f"⚠️ Dispositivo non trovato\n\n", "red")
-            result = False
-        else:
-            if not serial[:2] == serial_num_code:
-                # Print to text editor
-                editor.insert(tk.END, f"⚠️ Codice dispositivo riportato nel seriale non valido\n\n", "red")
-                result = False
-            if not len(serial) == serial_num_length:
-                # Print to text editor
-                editor.insert(tk.END, f"⚠️ Lunghezza del seriale non valida\n\n", "red")
-                result = False
-            if (not "A" <= mounth <= "L") or (mounth != date[0]):
-                # Print to text editor
-                editor.insert(tk.END, f"⚠️ ATTENZIONE: Mese inserito non attuale\n\n", "orange")
-            if (not 0 <= year <= 99) or (str(year) != date[1]):
-                # Print to text editor
-                editor.insert(tk.END, "⚠️ ATTENZIONE: Anno inserito non attuale\n\n", "orange")
-            if not 0 <= counter <= 9999:
-                # Print to text editor
-                editor.insert(tk.END, "⚠️ Progressivo inserito non valido\n\n", "red")
-                result = False
-            if not calculated_crc == crc:
-                # Print to text editor
-                editor.insert(tk.END, "⚠️ CRC inserito non valido\n\n", "red")
-                result = False
-        return result
+        # Search desired device in the product registry
+        check = check_serial(serial, products_by_name.get(TARGET_NAME), get_month_code())
+
+        # Print to text editor
+        for problem in check.errors + check.warnings:
+            editor.insert(tk.END, *SERIAL_MESSAGES[problem])
+
+        return check.valid
 
     except Exception as e:
         # Print to text editor
@@ -797,70 +1755,317 @@ def is_valid_serial(serial: str) -> bool:
         return False
 
 
-def increase_ant_id(value) -> None:
+def check_serial(serial: str, device: Product | None, date: list) -> SerialCheck:
     """
-    @description: Validates and increments the ANT ID counter stored in the configuration file. Resets the value to 1
-                  if it reaches the upper limit. Updates the TOML file and prints the result or any error message to
-                  the GUI editor.
+    @description: Checks a serial number against a product: prefix, length, month and year code, progressive counter
+                  and CRC. No message is printed, the problems found are returned.
+
+    @param serial: The serial number string to validate.
+    @param device: The product the serial number belongs to, None if unknown.
+    @param date: The current month letter and year suffix, as returned by get_month_code().
 
-    @param value: The current ANT ID counter to validate and increment.
+    @return check: The problems found in the serial number.
     """
-    global editor
+    check = SerialCheck(serial, [], [])
+
+    # Year and counter are 6 decimal digits and the CRC 4 upper case hex digits (int() alone would also accept signs,
+    # underscores and spaces)
+    if not (len(serial) >= 13 and serial[3:9].isascii() and serial[3:9].isdigit()
+            and all(char in "0123456789ABCDEF" for char in serial[9:13])):
+        check.errors.append("format")
+        return check
+
+    # Extraction of SerialNumber fields
+    month = str(serial[2])
+    year = int(serial[3:5])
+    counter = int(serial[5:9])
+    crc = int(serial[9:13], 16)
+
+    if device is None:
+        check.errors.append("device")
+        return check
+
+    if not serial[:2] == device.sn_code:
+        check.errors.append("prefix")
+    if not len(serial) == device.sn_length:
+        check.errors.append("length")
+    if (not "A" <= month <= "L") or (month != date[0]):
+        check.warnings.append("month")
+    if (not 0 <= year <= 99) or (str(year) != date[1]):
+        check.warnings.append("year")
+    if not 0 <= counter <= 9999:
+        check.errors.append("counter")
+    if not crc16_from_str(serial[0:9]) == crc:
+        check.errors.append("crc")
+
+    return check
+
+
+def validate_serials(serials, device_name: str = "") -> list[SerialCheck]:
+    """
+    @description: Validates a batch of serial numbers, e.g. a sheet of pre-printed labels. Each serial number is checked
+                  against the given product or, if no product is given, against the product of its prefix. Serial
+                  numbers repeated in the batch are reported as duplicate. The product registry must be loaded.
+
+    @param serials: Iterable of serial number strings; blank entries are skipped.
+    @param device_name: Name of the product of every serial number, empty to select it by prefix.
+
+    @return checks: The result of each serial number, in input order.
+    """
+    date = get_month_code()
+    device = products_by_name.get(device_name.upper()) if device_name else None
+    seen = set()
+    checks = []
+
+    for serial in serials:
+        serial = serial.strip().upper()
+        if not serial:
+            continue
+
+        if not device_name:
+            # Products sharing the prefix differ by serial number length
+            candidates = products_by_code.get(serial[:2], [])
+            device = next((item for item in candidates if item.sn_length == len(serial)),
+                          candidates[0] if candidates else None)
+
+        check = check_serial(serial, device, date)
+        if serial in seen:
+            check.errors.append("duplicate")
+        seen.add(serial)
+        checks.append(check)
+
+    return checks
+
 
+def validate_serials_cli(argv: list[str]) -> int:
+    """
+    @description: Command line front end of validate_serials(). Reads a file with one serial number per row and prints
+                  one semicolon-separated row for each serial number: serial, result, errors and warnings.
+
+    @param argv: The command line arguments after the command name.
+
+    @return code: Exit code, 0 if every serial number is valid, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="square_main.py validate", description="Validazione di un lotto di seriali")
+    parser.add_argument("file", help="file con un seriale per riga")
+    parser.add_argument("--product", default="", help="prodotto dei seriali (default: ricavato dal prefisso)")
+    args = parser.parse_args(argv)
+
+    read_product_registry(products_file_path)
+    if args.product and args.product.upper() not in products_by_name:
+        parser.error(f"prodotto non trovato: {args.product}")
+
+    with open(args.file, 'r', encoding="utf-8") as data_file:
+        checks = validate_serials(data_file, args.product)
+
+    print("Serial_Number;Result;Errors;Warnings")
+    for check in checks:
+        print(f"{check.serial};{'OK' if check.valid else 'ERR'};{','.join(check.errors)};{','.join(check.warnings)}")
+
+    invalid = sum(not check.valid for check in checks)
+    print(f"{len(checks)} seriali, {invalid} non validi", file=sys.stderr)
+
+    return 1 if invalid else 0
+
+
+def generate_serials(device: Product, month: str, year: str, first: int, count: int, skip=frozenset()):
+    """
+    @description: Generates consecutive valid serial numbers of a product, in the format checked by check_serial().
+                  The CRC of the part common to every serial number is calculated once, then only the 4 counter digits
+                  are added for each serial number.
+
+    @param device: The product of the serial numbers.
+    @param month: The month letter (A = January, ..., L = December).
+    @param year: The two-digit year.
+    @param first: The progressive counter of the first serial number.
+    @param count: The number of counters to generate.
+    @param skip: Serial numbers not to emit (e.g. already recorded in the LOG file).
+
+    @return serials: Iterator over the serial numbers.
+    """
+    if device.sn_length != 13:
+        raise ValueError(f"formato del seriale di {device.name} non supportato")
+    if not "A" <= month <= "L" or len(month) != 1:
+        raise ValueError(f"mese non valido: {month}")
+    if not (len(year) == 2 and year.isdigit()):
+        raise ValueError(f"anno non valido: {year}")
+    if not (0 <= first and count >= 0 and first + count <= 10000):
+        raise ValueError("progressivi fuori dall'intervallo 0000 - 9999")
+
+    prefix = f"{device.sn_code}{month}{year}"
+    prefix_crc = get_crc_16(prefix.encode('utf-8'))
+
+    # Arguments are checked on call, the serial numbers are produced on demand
+    def serials():
+        for counter in range(first, first + count):
+            digits = f"{counter:04d}"
+            serial = f"{prefix}{digits}{get_crc_16(digits.encode('utf-8'), prefix_crc):04X}"
+            if serial not in skip:
+                yield serial
+
+    return serials()
+
+
+def generate_serials_cli(argv: list[str]) -> int:
+    """
+    @description: Command line front end of generate_serials(). Writes the serial numbers as a semicolon-separated CSV
+                  file for the label printer, one row at a time.
+
+    @param argv: The command line arguments after the command name.
+
+    @return code: Exit code, 0 on success.
+    """
+    month, year = get_month_code()
+
+    parser = argparse.ArgumentParser(prog="square_main.py generate", description="Generazione di seriali per etichette")
+    parser.add_argument("product", help="prodotto dei seriali, come in products.toml")
+    parser.add_argument("--first", type=int, default=0, help="primo progressivo (default: 0)")
+    parser.add_argument("--count", type=int, required=True, help="numero di progressivi")
+    parser.add_argument("--month", default=month, help="lettera del mese (default: mese attuale)")
+    parser.add_argument("--year", default=year, help="anno a due cifre (default: anno attuale)")
+    parser.add_argument("--skip-logged", action="store_true", help="salta i seriali già presenti nel file di LOG")
+    parser.add_argument("--output", help="file CSV di uscita (default: standard output)")
+    args = parser.parse_args(argv)
+
+    read_product_registry(products_file_path)
+    device = products_by_name.get(args.product.upper())
+    if device is None:
+        parser.error(f"prodotto non trovato: {args.product}")
+
+    skip = SerialIndex(log_file_path).snapshot() if args.skip_logged else frozenset()
     try:
-        # Validation
-        if not (1 <= value <= 65534):
-            # Print to text editor
-            editor.insert(tk.END, f"❌ ANT ID caricato dal file {toml_file_path} non valido!!\n\n", "red")
-            return
+        serials = generate_serials(device, args.month.upper(), args.year, args.first, args.count, skip)
+    except ValueError as e:
+        parser.error(str(e))
 
-        # Increase o reset
-        value = 1 if value == 65534 else value + 1
+    with (open(args.output, 'w', newline='', encoding="utf-8") if args.output else
+          contextlib.nullcontext(sys.stdout)) as data_file:
+        writer = csv.writer(data_file, delimiter=';', lineterminator='\n')
+        writer.writerow(["Serial_Number", "Product"])
+        written = 0
+        for serial in serials:
+            writer.writerow([serial, device.name])
+            written += 1
 
-        # Assign new ANT ID value
-        settings["VARIABLES"]["ant_id_cnt"] = value
+    print(f"{written} seriali generati, {args.count - written} saltati", file=sys.stderr)
 
-        # TOML file complete path
-        config_path = os.path.join(get_application_path(), toml_file_path)
+    return 0
 
-        # Write new ANT ID value in toml file
-        with open(config_path, "wb") as sett_file:
-            tomli_w.dump(settings, sett_file)
 
-        # Print to text editor
-        editor.insert(tk.END, f"ANT ID aggiornato: {value}\n\n")
-    except FileNotFoundError:
-        print("File di configurazione mancante.")
+def find_records_cli(argv: list[str]) -> int:
+    """
+    @description: Command line front end of TestRecordStore.find(). Prints the test records with the given value of an
+                  indexed column as semicolon-separated rows in the SAP LOG format, header included.
+
+    @param argv: The command line arguments after the command name.
+
+    @return code: Exit code, 0 if at least one record was found, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="square_main.py find", description="Ricerca nello storico dei collaudi")
+    parser.add_argument("field", choices=RECORD_INDEXES, help="colonna indicizzata da cercare")
+    parser.add_argument("value", help="valore da cercare")
+    parser.add_argument("--db", default=record_db_file_path,
+                        help=f"database dei collaudi (default: {record_db_file_path})")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"database non trovato: {args.db}")
+
+    store = TestRecordStore(args.db)
+    try:
+        rows = store.find(args.field, args.value)
+    finally:
+        store.close()
+
+    print(';'.join(LOG_FIELDS))
+    for row in rows:
+        print(';'.join(row))
+    print(f"{len(rows)} record trovati", file=sys.stderr)
+
+    return 0 if rows else 1
+
+
+def export_records_cli(argv: list[str]) -> int:
+    """
+    @description: Command line front end of TestRecordStore.export_sap_log(). Writes every test record of the store to
+                  a LOG file in the SAP format, e.g. to rebuild a lost or damaged sap_log.txt.
+
+    @param argv: The command line arguments after the command name.
+
+    @return code: Exit code, 0 on success.
+    """
+    parser = argparse.ArgumentParser(prog="square_main.py export", description="Esportazione dello storico nel LOG SAP")
+    parser.add_argument("output", help="file di LOG da scrivere (sovrascritto se esiste)")
+    parser.add_argument("--db", default=record_db_file_path,
+                        help=f"database dei collaudi (default: {record_db_file_path})")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"database non trovato: {args.db}")
+
+    store = TestRecordStore(args.db)
+    try:
+        count = store.export_sap_log(args.output)
+    finally:
+        store.close()
+
+    print(f"{count} record esportati in {args.output}", file=sys.stderr)
+
+    return 0
+
+
+def get_next_ant_id() -> int | None:
+    """
+    @description: Returns the ANT ID to write in the device under test, taken from the block leased to this station.
+                  The allocator is opened on first use; when its store is new, the counter starts from the ant_id_cnt
+                  value of the configuration file.
+
+    @return ant_id: The next ANT ID, or None if the allocator is not available.
+    """
+    global editor, ant_id_allocator
+
+    try:
+        if ant_id_allocator is None or ant_id_allocator.path != ANT_ID_STORE:
+            ant_id_allocator = AntIdAllocator(ANT_ID_STORE, STATION_ID, ANT_ID_BLOCK, ANT_ID)
+        else:
+            ant_id_allocator.block_size = ANT_ID_BLOCK
+
+        return ant_id_allocator.peek()
+
     except Exception as e:
         # Print to text editor
-        editor.insert(tk.END, f"❌ Errore durante increase_ant_id: {e}", "red")
+        editor.insert(tk.END, f"❌ Errore durante get_next_ant_id(): {e}\n\n", "red")
+        return None
 
 
-def write_log(query_fields, filename=log_file_path) -> None:
+def consume_ant_id(serial_number: str) -> bool:
     """
-    @description: Writes header information to a log file. If the file does not exist or is empty, it creates the file
-                  and inserts the formatted header line using semicolon-separated fields.
+    @description: Records the ANT ID written in the device as used, so the next device gets a new one. Prints the result
+                  or any error message to the GUI editor. The ANT ID stays available until it is recorded in the
+                  journal of the allocator.
+
+    @param serial_number: The serial number of the device that received the ANT ID.
 
-    @param query_fields: A list of strings representing column names to be written as the header.
-    @param filename: Path to the log file where the header should be written.
+    @return result: True if the ANT ID has been recorded, False otherwise.
     """
+    global editor
+
     try:
-        # Check if the file exists and has content
-        if not os.path.exists(filename) or os.path.getsize(filename) == 0:
-            # If file is new or empty, write the header
-            with open(filename, 'w') as data_file:
-                data_file.write(';'.join(query_fields) + '\n')
+        ant_id = ant_id_allocator.consume(serial_number)
 
+        # Print to text editor
+        editor.insert(tk.END, f"ANT ID {ant_id} assegnato a {serial_number}\n\n")
+        return True
     except Exception as e:
         # Print to text editor
-        editor.insert(tk.END, f"❌ Errore durante write_log(): {e}\n\n", "red")
+        editor.insert(tk.END, f"❌ Errore durante consume_ant_id(): {e}\n\n", "red")
+        return False
 
 
 def write_report_log(ble_address, serial_number, fw_version, ant_id, result) -> None:
     """
-    @description: Generates and appends a formatted report entry to the log file, including metadata about the
-                  BLE device, test execution details, and serial identification. The log header is written if missing
-                  or empty.
+    @description: Generates a formatted report entry, including metadata about the BLE device, test execution
+                  details, and serial identification, and queues it to the background LOG writer.
 
     @param ble_address: The BLE address of the tested device.
     @param serial_number: The serial number used for identification.
@@ -874,13 +2079,6 @@ def write_report_log(ble_address, serial_number, fw_version, ant_id, result) ->
         # Create the query dictionary using query_fields
         query: dict[str, str | int | None] = {}
 
-        # Define the query fields
-        query_fields = ['Date', 'Time', 'Serial_Number', 'ANT_ID', 'FWVersion', 'HWVersion', 'SW_Testing', 'Batch',
-                        'Producer', 'Manufacturer', 'BLE_Addr', 'Result']
-
-        # Call the function to write to the log file (only if new or empty)
-        write_log(query_fields, log_file_path)
-
         # Prepare the list of data to write in LOG file
         query['Date'] = datetime.now().strftime("%d/%m/%Y")
         query['Time'] = datetime.now().strftime("%H:%M")
@@ -895,14 +2093,21 @@ def write_report_log(ble_address, serial_number, fw_version, ant_id, result) ->
         query['BLE_Addr'] = ble_address
         query['Result'] = result
 
-        # Open the file in append mode
-        with open(log_file_path, 'a') as log_data_file:
-            # Write all values in a single line, separated by a space
-            log_data_file.write(';'.join(str(value) for value in query.values()) + '\n')
+        # Queue the row to the LOG writer
+        log_writer.write(list(query.values()))
 
-        # Print to text editor
-        editor.insert(tk.END, "Il report di LOG è stato generato\n\n")
-        set_indicator(canvas2, report_indicator, "green")
+        # Index the new row before it reaches the file
+        if serial_index is not None:
+            serial_index.add(serial_number)
+
+        if log_writer.failed:
+            # Print to text editor
+            editor.insert(tk.END, "❌ Il file di LOG non è scrivibile, il report resta in coda\n\n", "red")
+            set_indicator(canvas2, report_indicator, "red")
+        else:
+            # Print to text editor
+            editor.insert(tk.END, "Il report di LOG è stato generato\n\n")
+            set_indicator(canvas2, report_indicator, "green")
     except Exception as e:
         # Print to text editor
         editor.insert(tk.END, f"❌ Errore durante write_report_log(): {e}", "red")
@@ -913,7 +2118,8 @@ def set_indicator(canv: tk.Canvas, indicator: int, colour: str) -> None:
     """
     @description: Updates the fill color of the buttons indicator displayed in the GUI. Only accepted colors defined in
                   ValidColours are allowed. If an invalid color is passed or an update error occurs, the issue is logged
-                  in the text editor.
+                  in the text editor. The change is posted to the UI dispatcher, so the function can be called from
+                  the BLE worker.
     @param canv:
     @param indicator:
     @param colour: Name of the color to apply to the buttons indicator element.
@@ -925,7 +2131,7 @@ def set_indicator(canv: tk.Canvas, indicator: int, colour: str) -> None:
         return
 
     try:
-        canv.itemconfig(indicator, fill=colour)
+        ui_dispatcher.post(lambda: canv.itemconfig(indicator, fill=colour))
     except Exception as e:
         # Print to text editor
         editor.insert(tk.END, f"❌ Errore durante set_indicator(): {e}\n\n", "red")
@@ -935,12 +2141,13 @@ def start_operation() -> None:
     """
     @description: Initiates the button testing workflow and prepares the GUI for execution. Displays a log message,
                   resets visual indicators, and validates the serial number if required. The actual test process runs
-                  asynchronously in a separate thread.
+                  asynchronously on the BLE worker thread.
     """
     global editor, start_button, first_test, user_input, status_ok, FINAL_TEST
 
     try:
         # Print to text editor
+        editor.start_transcript()
         editor.insert(tk.END, "INIZIO COLLAUDO\n\n", "bold")
 
         # Reset button and indicatore state
@@ -950,17 +2157,18 @@ def start_operation() -> None:
             set_indicator(canvas2, report_indicator, "grey")
         set_indicator(canvas, buttons_indicator, "grey")
 
-        # Insert and check SerialNumber only if there is the first test
-        if first_test and FINAL_TEST == "true":
+        # Insert SerialNumber in the Tk thread, check it here only if there is the first test
+        if FINAL_TEST == "true":
             user_input = insert_serial_number()
+        if first_test and FINAL_TEST == "true":
             if check_serial_number(user_input):
                 # Print to text editor
                 editor.insert(tk.END, "✅ Seriale inserito valido\n\n")
             else:
                 status_ok = False
 
-        # Run the async operation in a separate thread to avoid blocking the main thread
-        threading.Thread(target=run_async_operation).start()
+        # Run the async operation on the BLE worker to avoid blocking the main thread
+        ble_worker.submit(async_operation)
     except Exception as e:
         # Print to text editor
         editor.insert(tk.END, f"❌ Errore durante start_operation(): {e}\n\n", "red")
@@ -969,10 +2177,9 @@ def start_operation() -> None:
 def restart() -> None:
     """
     @description: Resets the GUI and internal variables to prepare for a new button testing session.
-                  Clears input fields, restores label layout, resets indicators, and reinitializes status values.
+                  Clears input fields, resets the buttons grid and the indicators, and reinitializes status values.
     """
-    global editor, entry, user_input, start_button, labels, saved_label_row, status_ok, first_test
-    global out_button_pressed, button_pressed, count_buttons_memory, iteration
+    global editor, entry, user_input, start_button, status_ok, first_test
 
     try:
         # Reset editor
@@ -988,18 +2195,8 @@ def restart() -> None:
         if FINAL_TEST == "true":
             set_indicator(canvas2, report_indicator, "grey")
 
-        # Editing buttons label values
-        labels = []
-        for i in range(20):
-            # Determines the column (0 for first 10, 1 for the rest)
-            label_col = i // 10
-            label_row = saved_label_row + (i % 10)
-            label = tk.Label(frame_sx, text="", font=("Arial", 16, "bold"), width=20)
-            label.grid(row=label_row, column=label_col, padx=1, pady=1)
-            labels.append(label)
-        
-        # Initial update of labels with a list of zeros
-        update_labels([0] * 20)
+        # Reset the buttons grid in place with a list of zeros
+        update_labels([0] * len(product.buttons))
         set_labels_name()
 
         # Initial text
@@ -1016,60 +2213,521 @@ def restart() -> None:
         editor.insert(tk.END, f"❌ Errore durante restart(): {e}\n\n", "rosso")
 
 
-def run_async_operation() -> None:
+def open_record_store(db_file: str, log_file: str) -> TestRecordStore | None:
     """
-    @description: Initializes and runs a new asyncio event loop to execute the main asynchronous testing operation in a
-                  non-blocking context. This allows BLE communication and testing tasks to operate independently of
-                  the GUI thread.
+    @description: Opens the test record store. When the store is new and a LOG file exists, the LOG rows are imported
+                  so that the store holds the whole production history.
+
+    @param db_file: Path to the SQLite database file.
+    @param log_file: Path to the SAP LOG file.
+
+    @return store: The opened store, or None if it could not be opened.
     """
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(async_operation())
+        store = TestRecordStore(db_file)
+
+        if store.is_empty() and os.path.exists(log_file):
+            count = store.import_sap_log(log_file)
+            # Print to text editor
+            editor.insert(tk.END, f"Importati {count} record dal file di LOG\n\n")
+
+        return store
 
     except Exception as e:
         # Print to text editor
-        editor.insert(tk.END, f"❌ Errore durante run_async_operation(): {e}\n\n", "red")
+        editor.insert(tk.END, f"❌ Errore durante open_record_store(): {e}\n\n", "red")
+        return None
+
+
+def close_application() -> None:
+    """
+    @description: Handles the closing of the main window. Stops the BLE worker, so the running test and the
+                  background scanner release the BLE connections, flushes the LOG writer, then closes the test record
+                  store and destroys the GUI.
+    """
+    try:
+        ble_worker.stop()
+        unsaved = log_writer.close()
+        # The record store stays open if the writer is still blocked on the disk and may use it
+        if record_store is not None and not log_writer.is_alive():
+            record_store.close()
+        if unsaved:
+            messagebox.showerror("LOG", f"{unsaved} record non salvati nel file di LOG o nel database.\n"
+                                        f"Controllare la console.")
+        if ant_id_allocator is not None:
+            ant_id_allocator.close()
 
+    except Exception as e:
+        # Print to console
+        print(f"❌ Errore durante close_application(): {e}\n")
+    finally:
+        root.destroy()
+
+
+async def start_scanner(detection_callback) -> BleakScanner:
+    """
+    @description: Creates and starts a BLE scanner delivering advertisements to the given callback. In passive mode
+                  (SCAN_MODE = "passive") no scan requests are sent and, on Linux, BlueZ advertisement-monitor patterns
+                  let only the target devices reach the callback. Where passive scanning is not supported the scanner
+                  falls back to active scanning, and passive mode is not tried again.
+
+    @param detection_callback: Function called with (device, adv) for every advertisement received.
 
-async def scan_get_sorted_devices(desired_type: str) -> list:
+    @return scanner: The started scanner, to be stopped by the caller.
     """
-    @description: Scans for nearby BLE devices and filters the results based on a desired device name and RSSI
-                  threshold. Returns a list of matching devices sorted by signal strength, or displays a warning
-                  if none are found.
+    global passive_scan_supported, editor
+
+    if SCAN_MODE == "passive" and passive_scan_supported:
+        try:
+            scanner = BleakScanner(detection_callback=detection_callback, scanning_mode="passive",
+                                   **get_passive_scan_arguments())
+            await scanner.start()
+            return scanner
+
+        except Exception as e:
+            passive_scan_supported = False
+            # Print to text editor
+            editor.insert(tk.END, f"⚠️ Scansione passiva non supportata, uso scansione attiva: {e}\n\n", "orange")
+
+    scanner = BleakScanner(detection_callback=detection_callback)
+    await scanner.start()
+    return scanner
+
+
+def get_passive_scan_arguments() -> dict:
+    """
+    @description: Returns the platform specific arguments of a passive BleakScanner. On Linux BlueZ requires at least
+                  one advertisement-monitor pattern: the local name of the target device and the service UUID / service
+                  data of the Elite proprietary services family (128-bit UUIDs are advertised little endian, so the
+                  common 347b00xx-... suffix is at the beginning of the field).
+
+    @return arguments: Keyword arguments to pass to BleakScanner.
+    """
+    if not sys.platform.startswith("linux"):
+        return {}
+
+    from bleak.assigned_numbers import AdvertisementDataType
+    from bleak.backends.bluezdbus.advertisement_monitor import OrPattern
+    from bleak.backends.bluezdbus.scanner import BlueZScannerArgs
+
+    name = TARGET_NAME.encode("utf-8")
+    elite_uuid = bytes(reversed(bytes.fromhex(ELITE_UUID_SUFFIX.replace("-", ""))))
+    or_patterns = [
+        OrPattern(0, AdvertisementDataType.COMPLETE_LOCAL_NAME, name),
+        OrPattern(0, AdvertisementDataType.SHORTENED_LOCAL_NAME, name),
+        OrPattern(0, AdvertisementDataType.SERVICE_DATA_UUID128, elite_uuid),
+        OrPattern(0, AdvertisementDataType.COMPLETE_LIST_SERVICE_UUID128, elite_uuid),
+        OrPattern(0, AdvertisementDataType.INCOMPLETE_LIST_SERVICE_UUID128, elite_uuid),
+    ]
+
+    return {"bluez": BlueZScannerArgs(or_patterns=or_patterns)}
+
+
+async def background_scan() -> None:
+    """
+    @description: Scans continuously for BLE devices and records every advertisement of the target devices in the
+                  device registry, evicting expired entries periodically. If the scanner stops because of an error it is
+                  restarted after a short pause.
+    """
+    scan_filters = build_scan_filters(TARGET_NAME)
+
+    def detection_callback(device, adv) -> None:
+        if passes_scan_filters(scan_filters, device, adv):
+            device_registry.update(device, adv)
+
+    while True:
+        try:
+            scanner = await start_scanner(detection_callback)
+            try:
+                while True:
+                    await asyncio.sleep(REGISTRY_TTL)
+                    device_registry.evict()
+                    # Follow the settings reloaded before each test
+                    scan_filters = build_scan_filters(TARGET_NAME)
+            finally:
+                await scanner.stop()
+
+        except Exception as e:
+            # Print to console
+            print(f"❌ Errore durante background_scan(): {e}\n")
+            device_registry.clear()
+            await asyncio.sleep(1)
+
+
+async def scan_get_sorted_devices(desired_type: str) -> list[RegistryEntry]:
+    """
+    @description: Scans for nearby BLE devices and filters the advertisements as they arrive through the candidate
+                  filters returned by build_scan_filters(). Every advertisement of a matching device is aggregated in a
+                  smoothed RSSI. The scan stops as soon as a matching device has been seen SCAN_SETTLE_ADV times or
+                  SCAN_SETTLE_TIME seconds after the first match and the closest device leads the others by RSSI_MARGIN,
+                  falling back to the full SCAN_TIMEOUT otherwise. Returns the ranking of the matching devices, or
+                  displays a warning if none are found.
 
     @param desired_type: The name of the BLE device type to search for.
 
-    @return sorted_devices: A list of tuples containing matching BLE devices data, sorted by RSSI.
+    @return ranking: A list of registry entries of the matching devices, sorted by smoothed RSSI.
     """
     global editor
 
-    # Scan for BLE devices
-    devices = await BleakScanner.discover(timeout=SCAN_TIMEOUT, return_adv=True)
+    # Matching devices seen during the scan
+    scan_registry = DeviceRegistry(SCAN_TIMEOUT + 1, REGISTRY_SIZE)
+    scan_filters = build_scan_filters(desired_type)
+    # Flags shared with the detection callback
+    scan_state = {"any_device": False, "settle_started": False}
+    settled = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def detection_callback(device, adv) -> None:
+        scan_state["any_device"] = True
+
+        # Discard devices rejected by the candidate filters
+        if not passes_scan_filters(scan_filters, device, adv):
+            return
+
+        count = scan_registry.update(device, adv)
+
+        # Check the ranking after enough advertisements from the same device
+        if 0 < SCAN_SETTLE_ADV <= count:
+            settled.set()
+        # Otherwise give the other devices a short window to show up
+        if SCAN_SETTLE_TIME > 0 and not scan_state["settle_started"]:
+            scan_state["settle_started"] = True
+            loop.call_later(SCAN_SETTLE_TIME, settled.set)
+
+    try:
+        # Scan for BLE devices until the ranking is settled or the timeout expires
+        deadline = loop.time() + SCAN_TIMEOUT
+        scanner = await start_scanner(detection_callback)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(settled.wait(), timeout=max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    break
+                settled.clear()
+                if select_closest_device(scan_registry.get_ranking(RSSI_MIN, REGISTRY_MIN_ADV)) is not None:
+                    break
+        finally:
+            await scanner.stop()
+
+        if not scan_state["any_device"]:
+            # Print to text editor
+            editor.insert(tk.END, "⚠️Nessun dispositivo BLE trovato\n")
+            return []
+
+        # Return the devices sorted by RSSI (signal strength)
+        return scan_registry.get_ranking(RSSI_MIN, REGISTRY_MIN_ADV)
 
-    if not devices:
+    except Exception as e:
         # Print to text editor
-        editor.insert(tk.END, "⚠️Nessun dispositivo BLE trovato\n")
+        editor.insert(tk.END, f"❌Errore durante scan_get_sorted_devices(): {e}\n", "red")
         return []
 
-    try:
-        # Create a new dict where insert only square devices
-        square_devices = {
-            address: (device, adv)
-            for address, (device, adv) in devices.items()
-            if (device.name == desired_type) or (adv.local_name == desired_type) and
-               (adv.rssi is not None and adv.rssi >= RSSI_MIN)
-        }
 
-        # Sort devices by RSSI (signal strength)
-        sorted_devices = sorted(square_devices.items(), key=lambda x: x[1][1].rssi, reverse=True)
+def build_scan_filters(desired_type: str) -> list:
+    """
+    @description: Builds the candidate filter pipeline applied to every advertisement as it arrives. Filters are
+                  ordered from the cheapest and most selective: exclusion list of addresses, device name and, if
+                  enabled, advertised Elite service UUID (347b00xx-... family). The RSSI threshold is not applied here:
+                  every advertisement of a matching device feeds the smoothed RSSI, and the threshold is applied to the
+                  smoothed value by DeviceRegistry.get_ranking().
+
+    @param desired_type: The name of the BLE device type to search for.
+
+    @return filters: A list of predicates taking (device, adv) and returning True if the advertisement is accepted.
+    """
+    excluded = EXCLUDED_ADDRESSES
+    filters = []
+
+    if excluded:
+        filters.append(lambda device, adv: device.address.upper() not in excluded)
+    filters.append(lambda device, adv: device.name == desired_type or adv.local_name == desired_type)
+    if SERVICE_UUID_FILTER == "true":
+        filters.append(has_elite_service)
+
+    return filters
+
+
+def passes_scan_filters(filters: list, device, adv) -> bool:
+    """
+    @description: Applies the candidate filter pipeline to an advertisement, stopping at the first rejection.
+
+    @param filters: The filter pipeline returned by build_scan_filters().
+    @param device: The BLEDevice that sent the advertisement.
+    @param adv: The advertisement data received.
+
+    @return bool: True if every filter accepts the advertisement, False otherwise.
+    """
+    for scan_filter in filters:
+        if not scan_filter(device, adv):
+            return False
+
+    return True
+
+
+def has_elite_service(device, adv) -> bool:
+    """
+    @description: Checks whether an advertisement carries a service UUID or service data of the Elite proprietary
+                  services family.
+
+    @param device: The BLEDevice that sent the advertisement.
+    @param adv: The advertisement data received.
+
+    @return bool: True if an Elite service UUID is advertised, False otherwise.
+    """
+    for uuid in (*adv.service_uuids, *adv.service_data):
+        if uuid.startswith(ELITE_UUID_PREFIX) and uuid.endswith(ELITE_UUID_SUFFIX):
+            return True
+
+    return False
+
+
+def select_closest_device(ranking: list[RegistryEntry]) -> RegistryEntry | None:
+    """
+    @description: Chooses the closest device of a ranking only if its smoothed RSSI leads the second-best candidate
+                  by at least RSSI_MARGIN dB, so a momentary spike from a neighbouring bench cannot win the selection.
+
+    @param ranking: A list of registry entries sorted by smoothed RSSI.
+
+    @return entry: The registry entry of the chosen device, or None if the ranking is empty or not decisive.
+    """
+    if not ranking:
+        return None
+    if len(ranking) > 1 and ranking[0].rssi - ranking[1].rssi < RSSI_MARGIN:
+        return None
+
+    return ranking[0]
+
+
+def print_ranking_table(ranking: list[RegistryEntry]) -> None:
+    """
+    @description: Prints to the text editor the ranking of the candidate devices with their smoothed and last RSSI
+                  and the number of advertisements received.
+
+    @param ranking: A list of registry entries sorted by smoothed RSSI.
+    """
+    global editor
 
-        # Return the sorted list of devices
-        return sorted_devices
+    try:
+        # Print to text editor
+        editor.insert(tk.END, f"{'#':<3}{'Indirizzo':<20}{'RSSI medio':>11}{'RSSI ultimo':>12}{'Adv':>6}\n", "bold")
+        for position, entry in enumerate(ranking, start=1):
+            editor.insert(tk.END, f"{position:<3}{entry.device.address:<20}{entry.rssi:>11.1f}"
+                                  f"{entry.adv.rssi:>12}{entry.count:>6}\n")
+        editor.insert(tk.END, "\n")
 
     except Exception as e:
         # Print to text editor
-        editor.insert(tk.END, f"❌Errore durante scan_get_sorted_devices(): {e}\n", "red")
+        editor.insert(tk.END, f"❌ Errore durante print_ranking_table(): {e}\n\n", "red")
+
+
+async def connect_with_retry(candidates: list[RegistryEntry]) -> BleakClient | None:
+    """
+    @description: Connects to the first device of the candidate list that accepts the connection. Each device is tried
+                  up to BLE_RETRIES + 1 times with an exponential backoff starting from BLE_RETRY_DELAY, then the next
+                  candidate is tried, up to BLE_CANDIDATES devices. The connection uses the BLEDevice found by the scan,
+                  so bleak does not discover the device again, and the cached GATT layout (see connect_device()).
+                  Every attempt and its latency are printed to the editor.
+
+    @param candidates: The registry entries of the devices to try, in order of preference.
+
+    @return client: The connected BLE client, or None if no candidate accepted the connection.
+    """
+    global editor
+
+    for entry in candidates[:BLE_CANDIDATES]:
+        for attempt in range(1, BLE_RETRIES + 2):
+            start = time.perf_counter()
+            try:
+                client = await connect_device(entry.device)
+                # Print to text editor
+                editor.insert(tk.END, f"Tentativo {attempt} su {entry.device.address}: connesso in "
+                                      f"{(time.perf_counter() - start) * 1000:.0f} ms\n\n")
+                return client
+
+            except Exception as e:
+                # Print to text editor
+                editor.insert(tk.END, f"⚠️ Tentativo {attempt} su {entry.device.address}: fallito dopo "
+                                      f"{(time.perf_counter() - start) * 1000:.0f} ms ({e})\n", "orange")
+
+            # Wait before the next attempt on the same device
+            if attempt <= BLE_RETRIES:
+                await asyncio.sleep(BLE_RETRY_DELAY * 2 ** (attempt - 1))
+
+    return None
+
+
+async def connect_device(device) -> BleakClient:
+    """
+    @description: Connects to a device resolving only the services of the GATT layouts cached for the known firmware
+                  versions and, where the backend supports it (WinRT), using the services cached by the OS instead of a
+                  new discovery. If the firmware version of the device has no cached layout, the device is connected
+                  again with a full service discovery and its layout is added to the cache.
+
+    @param device: The BLEDevice to connect.
+
+    @return client: The connected BLE client. Raises the connection error if the device is not reachable.
+    """
+    cached_services = get_cached_services()
+
+    client = BleakClient(device, services=cached_services, timeout=BLE_TIMEOUT,
+                         winrt={"use_cached_services": cached_services is not None})
+    await client.connect()
+    try:
+        if await update_gatt_cache(client, cached_services is not None):
+            return client
+    except Exception:
+        await client.disconnect()
+        raise
+
+    # Cached layout not valid for this firmware: discover again
+    await client.disconnect()
+    client = BleakClient(device, timeout=BLE_TIMEOUT, winrt={"use_cached_services": False})
+    await client.connect()
+    try:
+        await update_gatt_cache(client, False)
+    except Exception:
+        await client.disconnect()
+        raise
+
+    return client
+
+
+def get_cached_services() -> list | None:
+    """
+    @description: Returns the service UUIDs of every GATT layout cached on disk, loading the cache file at first use.
+                  The layouts of the firmware versions of a lot differ little, so resolving all their services lets
+                  devices with any cached firmware be connected without a new discovery.
+
+    @return services: The sorted list of cached service UUIDs, or None if the cache is disabled or empty.
+    """
+    global gatt_cache
+
+    if GATT_CACHE != "true":
+        return None
+
+    if gatt_cache is None:
+        gatt_cache = {}
+        try:
+            with open(os.path.join(get_application_path(), gatt_cache_file_path), "r", encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+            # Layouts keyed by firmware version, oldest first
+            gatt_cache = dict(data.get("layouts", {}))
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    services = sorted({uuid for layout in gatt_cache.values() for uuid in layout})
+    return services or None
+
+
+async def update_gatt_cache(client: BleakClient, cached_layout: bool) -> bool:
+    """
+    @description: Validates the GATT layout of a connected device against the cache. With the cached layouts the
+                  firmware version (2A28) must have a cached layout and every characteristic used by the test must be
+                  present; after a full discovery the layout is stored in the cache file keyed by the firmware version,
+                  keeping the layouts of the other firmware versions (up to GATT_CACHE_SIZE, the least recently used
+                  are dropped).
+
+    @param client: The connected BLE client.
+    @param cached_layout: True if the client was connected with the cached layout.
+
+    @return bool: True if the layout of the connected client can be used, False if a full discovery is needed.
+    """
+    global gatt_cache
+
+    if GATT_CACHE != "true":
+        return True
+
+    if cached_layout:
+        required_chars = [product.buttons_char, product.control_point, *GATT_REQUIRED_CHARS]
+        if any(client.services.get_characteristic(normalize_uuid(uuid)) is None for uuid in required_chars):
+            return False
+        fw_version = (await client.read_gatt_char("2A28")).decode('utf-8')
+        if fw_version not in gatt_cache:
+            return False
+        # Most recently used layout last
+        gatt_cache[fw_version] = gatt_cache.pop(fw_version)
+        return True
+
+    fw_version = (await client.read_gatt_char("2A28")).decode('utf-8')
+    services = sorted(service.uuid for service in client.services)
+    if gatt_cache.get(fw_version) != services:
+        gatt_cache.pop(fw_version, None)
+        gatt_cache[fw_version] = services
+        while len(gatt_cache) > GATT_CACHE_SIZE:
+            del gatt_cache[next(iter(gatt_cache))]
+
+        # Write the cache file atomically, the connection does not depend on it (e.g. read-only application folder)
+        config_path = os.path.join(get_application_path(), gatt_cache_file_path)
+        try:
+            with open(config_path + ".tmp", "w", encoding="utf-8") as cache_file:
+                json.dump({"layouts": gatt_cache}, cache_file, indent=2)
+            os.replace(config_path + ".tmp", config_path)
+        except OSError as e:
+            # Print to text editor
+            editor.insert(tk.END, f"⚠️ Cache GATT non salvata: {e}\n", "orange")
+
+    return True
+
+
+def normalize_uuid(uuid: str) -> str:
+    """
+    @description: Expands a 16-bit Bluetooth SIG UUID (e.g. "2A28") to its 128-bit lower case form.
+
+    @param uuid: 16-bit or 128-bit UUID string.
+
+    @return uuid: The 128-bit UUID string.
+    """
+    if len(uuid) == 4:
+        return f"0000{uuid}-0000-1000-8000-00805f9b34fb".lower()
+
+    return uuid.lower()
+
+
+@contextlib.asynccontextmanager
+async def connect_best_candidate(candidates: list[RegistryEntry]):
+    """
+    @description: Async context manager around connect_with_retry(). Yields the connected client and disconnects it
+                  on exit.
+
+    @param candidates: The registry entries of the devices to try, in order of preference.
+
+    @return client: The connected BLE client. Raises ConnectionError if no candidate accepted the connection.
+    """
+    client = await connect_with_retry(candidates)
+    if client is None:
+        raise ConnectionError(f"nessun dispositivo raggiungibile su {min(len(candidates), BLE_CANDIDATES)} candidati")
+
+    try:
+        yield client
+    finally:
+        if client.is_connected:
+            await client.disconnect()
+
+
+async def prefetch_device_data(client: BleakClient) -> dict:
+    """
+    @description: Enables the EEPROM result notifications and reads the data needed by the EEPROM programming: firmware
+                  version (2A28), ANT ID characteristic (2A25) and the EEPROM parameter area. In pipelined mode
+                  (PIPELINE = "true") it runs concurrently with the button test, so only the EEPROM writes are left
+                  after the buttons pass.
+
+    @param client: Connected BLE client used to communicate with the target device.
+
+    @return data: Dictionary with the firmware version, the ANT ID characteristic and the EEPROM image.
+    """
+    # Notifications/indications enabled
+    await client.start_notify(UUID_EEPROM_RESULT, notification_eeprom)
+
+    # Read SW version from BLE
+    sw_version = await client.read_gatt_char("2A28")
+    # Read ANT ID from BLE
+    ant_id_from_char = await client.read_gatt_char("2A25")
+    print(f"Valore di ANT ID letto da BLE: {int(ant_id_from_char)}\n")
+    # Read the EEPROM parameter area in a single request
+    eeprom_image = await read_eeprom_image(client)
+
+    return {"fw_version": sw_version.decode('utf-8'), "ant_id_char": ant_id_from_char, "eeprom_image": eeprom_image}
 
 
 def insert_serial_number() -> str:
@@ -1127,44 +2785,66 @@ async def async_operation() -> None:
                   enabled), and handles GUI feedback and reporting accordingly. Manages timeout, validation, and user
                   prompts while ensuring proper session finalization.
     """
-    global editor, out_button_pressed, status_ok, user_input, first_test, flag_exit
+    global editor, status_ok, user_input, first_test
     global PROD_BATCH, PRODUCER, FINAL_TEST, HW_VERSION, ANT_ID
     ble_address = ""
     name = ""
 
     try:
-        # Reset old values if an exit from thread is appeared
-        if flag_exit:
-            out_button_pressed = [0] * 20
-
         if not first_test:
             # Import data from settings file and check input values
             status_ok = import_data_file(toml_file_path)
             if status_ok:
                 if FINAL_TEST == "true":
-                    # Insert and check SerialNumber
-                    user_input = insert_serial_number()
+                    # Check SerialNumber inserted by start_operation()
                     if check_serial_number(user_input):
                         # Print to text editor
                         editor.insert(tk.END, "✅ Seriale inserito valido\n\n")
                     else:
                         status_ok = False
 
+        if status_ok and FINAL_TEST == "true":
+            # ANT ID of the device, from the block leased to this station (the store lock can be held by another
+            # station, so it is never waited for on the BLE loop)
+            ANT_ID = await asyncio.to_thread(get_next_ant_id)
+            if ANT_ID is None:
+                status_ok = False
+
         if status_ok:
             # Print to text editor
             editor.insert(tk.END, "🔍 Scansione dispositivi BLE in corso. Attendere...\n\n")
 
-            # Find Square devices near
-            all_squares_devices = await scan_get_sorted_devices(TARGET_NAME)
+            # Pick the Square devices near from the registry, scan only if it has no clear candidate
+            all_squares_devices = []
+            if BACKGROUND_SCAN == "true":
+                all_squares_devices = device_registry.get_ranking(RSSI_MIN, REGISTRY_MIN_ADV)
+            if select_closest_device(all_squares_devices) is None:
+                all_squares_devices = await scan_get_sorted_devices(TARGET_NAME)
             if not all_squares_devices:
                 # Print to text editor
                 editor.insert(tk.END,
                               f"⚠️ Nessun dispositivo {TARGET_NAME} trovato con RSSI ≥ {RSSI_MIN} dBm.\n", "red")
                 status_ok = False
             else:
+                print_ranking_table(all_squares_devices)
+
                 # Select SQUARE device nearer
-                ble_address, (target_device, target_adv) = all_squares_devices[0]
-                name = target_device.name or target_adv.local_name or TARGET_NAME
+                target = select_closest_device(all_squares_devices)
+                if target is None:
+                    # Print to text editor
+                    editor.insert(tk.END, f"⚠️ Più dispositivi {TARGET_NAME} vicini con RSSI simile "
+                                          f"(margine < {RSSI_MARGIN} dB), allontanare gli altri dispositivi.\n", "red")
+                    status_ok = False
+                else:
+                    ble_address = target.device.address
+                    name = target.device.name or target.adv.local_name or TARGET_NAME
+                    # Fallback candidates in case the closest device does not accept the connection, each one
+                    # leading the remaining devices by the same RSSI margin
+                    candidates = [target]
+                    remaining = [entry for entry in all_squares_devices if entry is not target]
+                    while (fallback := select_closest_device(remaining)) is not None:
+                        candidates.append(fallback)
+                        remaining.remove(fallback)
 
         if status_ok:
             # Print to text editor
@@ -1172,117 +2852,120 @@ async def async_operation() -> None:
             editor.insert(tk.END, "Attendere connessione col dispositivo...\n\n")
 
             try:
-                async with BleakClient(ble_address, timeout=BLE_TIMEOUT) as client:
-                    # Reset event and flag before starting
-                    button_event.clear()
+                async with connect_best_candidate(candidates) as client:
+                    # Address of the device actually connected
+                    ble_address = client.address
+
+                    # Reset event and button state before starting
+                    reset_button_state()
 
                     # Ensure that the client is connected
                     if client.is_connected:
                         # Check buttons
-                        await client.start_notify(SQUARE_BUTTONS_CHAR, notification_handler)
+                        await client.start_notify(product.buttons_char, notification_handler)
                         # Print to text editor
                         editor.insert(tk.END, "🔗 Connesso! Puoi iniziare il collaudo funzionale\n\n")
-                        time.sleep(1)
                         editor.insert(tk.END, f"Premere tutti i pulsanti entro {TEST_TIME}s\n")
-                        time.sleep(0.5)
                         editor.insert(tk.END, "NON DIMENTICARE DI TESTARE I LED!\n", "bold")
-                        time.sleep(0.5)
                         editor.insert(tk.END, "NON DIMENTICARE DI TESTARE I FRENI!\n\n", "bold")
 
-                        try:
-                            # Wait for event with timeout
-                            await asyncio.get_event_loop().run_in_executor(None,
-                                                                           lambda: button_event.wait(timeout=TEST_TIME))
-                        except asyncio.TimeoutError:
-                            # Print to text editor
-                            editor.insert(tk.END, "❌ Timeout scaduto!\n\n", "red")
-                            status_ok = False
-
-                        # Stop notifications/indications
-                        await client.stop_notify(SQUARE_BUTTONS_CHAR)
-
-                        if all(element == 1 for element in out_button_pressed) and status_ok:
-                            # Print to text editor
-                            editor.insert(tk.END, "Tutti i pulsanti sono stati premuti\n\n")
-                            set_indicator(canvas, buttons_indicator, "green")
-
-                            # Notifications/indications enabled
-                            await client.start_notify(UUID_EEPROM_RESULT, notification_eeprom)
-
-                            # Read SW version from BLE
-                            sw_version = await client.read_gatt_char("2A28")
-                            fw_version = sw_version.decode('utf-8')
-                            # Read ANT ID from BLE
-                            ant_id_from_char = await client.read_gatt_char("2A25")
-                            print(f"Valore di ANT ID letto da BLE: {int(ant_id_from_char)}\n")
-
-                            # Manufacturer test
-                            if FINAL_TEST == "true":
-                                # Read production batch loaded from EEPROM
-                                PROD_BATCH = await read_eeprom_parameter(client, EEPROM_BATCH_READ_REQUEST)
-                                # Read producer loaded from EEPROM
-                                PRODUCER = await read_eeprom_parameter(client, EEPROM_PRODUCER_READ_REQUEST)
-                                # Write HW version loaded from toml
-                                await write_eeprom_parameter(client, 1, EEPROM_HWVER_WRITE_REQUEST, HW_VERSION)
-                                # Write ANT ID loaded from toml
-                                await write_eeprom_parameter(client, 2, EEPROM_ANTID_WRITE_REQUEST, ANT_ID)
-                                time.sleep(1)
-                                # Read written HW_VERSION from EEPROM
-                                tmp_hw = await read_eeprom_parameter(client, EEPROM_HWVER_READ_REQUEST)
-                                # Read written ANT_ID from EEPROM
-                                tmp_aid = await read_eeprom_parameter(client, EEPROM_ANTID_READ_REQUEST)
+                        # Read static characteristics and EEPROM while the operator presses the buttons
+                        prefetch = asyncio.create_task(prefetch_device_data(client)) if PIPELINE == "true" else None
 
+                        try:
+                            try:
+                                # Wait for event with timeout, notifications keep being processed by the loop
+                                async with asyncio.timeout(TEST_TIME):
+                                    await button_event.wait()
+                            except TimeoutError:
                                 # Print to text editor
-                                editor.insert(tk.END, f"Dati scritti in EEPROM\n", "bold")
-                                editor.insert(tk.END, f"HW Version: {HW_VERSION}\n")
-                                editor.insert(tk.END, f"ANT-ID: {ANT_ID}\n\n")
+                                editor.insert(tk.END, "❌ Timeout scaduto!\n\n", "red")
+                                status_ok = False
 
-                                # Print to text editor
-                                editor.insert(tk.END, f"Dati letti da EEPROM\n", "bold")
-                                editor.insert(tk.END, f"Produttore: {PRODUCER}\n")
-                                editor.insert(tk.END, f"Lotto: {PROD_BATCH}\n\n")
+                            # Stop notifications/indications
+                            await client.stop_notify(product.buttons_char)
 
-                                if tmp_hw != HW_VERSION or tmp_aid != ANT_ID:
-                                    editor.insert(tk.END, "❌ Scrittura in EEPROM non valida!\n\n", "red")
-                                    status_ok = False
+                            if buttons_pressed_mask == product.target_mask and status_ok:
+                                # Print to text editor
+                                editor.insert(tk.END, "Tutti i pulsanti sono stati premuti\n\n")
+                                set_indicator(canvas, buttons_indicator, "green")
+
+                                # Firmware version, ANT ID characteristic and EEPROM image (prefetched if pipelined)
+                                device_data = await (prefetch or prefetch_device_data(client))
+                                fw_version = device_data["fw_version"]
+                                eeprom_image = device_data["eeprom_image"]
+
+                                # Manufacturer test
+                                if FINAL_TEST == "true":
+                                    eeprom_data = decode_eeprom_image(eeprom_image)
+                                    # Production batch and producer loaded from EEPROM
+                                    PROD_BATCH = eeprom_data["batch"]
+                                    PRODUCER = eeprom_data["producer"]
+                                    # Write only the HW version and ANT ID fields that differ from toml
+                                    written_image = await program_eeprom_delta(
+                                        client, eeprom_image, {"hw_version": HW_VERSION, "ant_id": ANT_ID})
+                                    save_eeprom_dump(user_input, client.address, eeprom_image, written_image)
+                                    eeprom_data = decode_eeprom_image(written_image)
+                                    tmp_hw = eeprom_data["hw_version"]
+                                    tmp_aid = eeprom_data["ant_id"]
+
+                                    # Print to text editor
+                                    editor.insert(tk.END, f"Dati scritti in EEPROM\n", "bold")
+                                    editor.insert(tk.END, f"HW Version: {HW_VERSION}\n")
+                                    editor.insert(tk.END, f"ANT-ID: {ANT_ID}\n\n")
+
+                                    # Print to text editor
+                                    editor.insert(tk.END, f"Dati letti da EEPROM\n", "bold")
+                                    editor.insert(tk.END, f"Produttore: {PRODUCER}\n")
+                                    editor.insert(tk.END, f"Lotto: {PROD_BATCH}\n\n")
+
+                                    if tmp_hw != HW_VERSION or tmp_aid != ANT_ID:
+                                        editor.insert(tk.END, "❌ Scrittura in EEPROM non valida!\n\n", "red")
+                                        status_ok = False
+                                    else:
+                                        editor.insert(tk.END, f"Dati scritti in EEPROM letti correttamente\n\n")
+
+                                # Producer test
                                 else:
-                                    editor.insert(tk.END, f"Dati scritti in EEPROM letti correttamente\n\n")
+                                    # Write only the batch (numero lotto) and producer fields that differ from toml
+                                    written_image = await program_eeprom_delta(
+                                        client, eeprom_image, {"batch": PROD_BATCH, "producer": PRODUCER})
+                                    save_eeprom_dump("", client.address, eeprom_image, written_image)
+                                    eeprom_data = decode_eeprom_image(written_image)
+                                    tmp_bat = eeprom_data["batch"]
+                                    tmp_prod = eeprom_data["producer"]
+
+                                    # Print to text editor
+                                    editor.insert(tk.END, f"Dati scritti in EEPROM\n", "bold")
+                                    editor.insert(tk.END, f"Produttore: {PRODUCER}\n")
+                                    editor.insert(tk.END, f"Lotto: {PROD_BATCH}\n\n")
+
+                                    if tmp_bat != PROD_BATCH or tmp_prod != PRODUCER:
+                                        editor.insert(tk.END, "❌ Scrittura in EEPROM non valida!\n\n", "red")
+                                        status_ok = False
+                                    else:
+                                        editor.insert(tk.END, f"Dati scritti in EEPROM letti correttamente\n\n")
+
+                                # Notifications/indications disabled
+                                await client.stop_notify(UUID_EEPROM_RESULT)
 
-                            # Producer test
+                                # Print to text editor
+                                editor.insert(tk.END, f"Spegnimento {product.name}...\n\n")
+                                # Shutdown command of the product
+                                await client.write_gatt_char(product.control_point, product.shutdown_command,
+                                                             response=False)
                             else:
-                                # Write batch (numero lotto) number loaded from toml
-                                await write_eeprom_parameter(client, 1, EEPROM_BATCH_WRITE_REQUEST, PROD_BATCH)
-                                # Write producer number loaded from toml
-                                await write_eeprom_parameter(client, 1, EEPROM_PRODUCER_WRITE_REQUEST, PRODUCER)
-                                time.sleep(1)
-                                # Read written HW_VERSION from EEPROM
-                                tmp_bat = await read_eeprom_parameter(client, EEPROM_BATCH_READ_REQUEST)
-                                # Read written ANT_ID from EEPROM
-                                tmp_prod = await read_eeprom_parameter(client, EEPROM_PRODUCER_READ_REQUEST)
-
                                 # Print to text editor
-                                editor.insert(tk.END, f"Dati scritti in EEPROM\n", "bold")
-                                editor.insert(tk.END, f"Produttore: {PRODUCER}\n")
-                                editor.insert(tk.END, f"Lotto: {PROD_BATCH}\n\n")
-
-                                if tmp_bat != PROD_BATCH or tmp_prod != PRODUCER:
-                                    editor.insert(tk.END, "❌ Scrittura in EEPROM non valida!\n\n", "red")
-                                    status_ok = False
-                                else:
-                                    editor.insert(tk.END, f"Dati scritti in EEPROM letti correttamente\n\n")
-
-                            # Notifications/indications disabled
-                            await client.stop_notify(UUID_EEPROM_RESULT)
-
-                            # Print to text editor
-                            editor.insert(tk.END, "Spegnimento Square...\n\n")
-                            # 0x01 shout down, 0x00 sleep
-                            await client.write_gatt_char(SQUARE_CONTROL_POINT, bytearray([0x0A, 0x00]), response=False)
-                        else:
-                            # Print to text editor
-                            editor.insert(tk.END, "❌ Fallimento: pulsanti non funzionano!\n", "red")
-                            # set_indicator(canvas, buttons_indicator, "red")
-                            status_ok = False
+                                editor.insert(tk.END, "❌ Fallimento: pulsanti non funzionano!\n", "red")
+                                # set_indicator(canvas, buttons_indicator, "red")
+                                status_ok = False
+                        finally:
+                            # Discard the prefetched data if not consumed (buttons failed or exception); a prefetch
+                            # already failed is still awaited, so its exception is retrieved
+                            if prefetch is not None:
+                                if not prefetch.done():
+                                    prefetch.cancel()
+                                await asyncio.gather(prefetch, return_exceptions=True)
                     else:
                         # Print to text editor
                         editor.insert(tk.END, "❌ Connessione BLE persa!\n", "red")
@@ -1293,15 +2976,15 @@ async def async_operation() -> None:
                 editor.insert(tk.END, f"❌ Connessione BLE fallita! {e}\n", "red")
                 status_ok = False
 
-        # Exit from thread
-        flag_exit = True
+        if status_ok and FINAL_TEST == "true":
+            # Record the ANT ID as used before the test is reported as passed, the test fails if it cannot be recorded
+            # so the ANT ID is never given to the next device
+            status_ok = await asyncio.to_thread(consume_ant_id, user_input)
 
         if status_ok:
             if FINAL_TEST == "true":
                 # Write report LOG only in final test
                 write_report_log(ble_address, user_input, fw_version, ANT_ID, "OK")
-                # Prepare ANT ID for next device only in last phase of the process
-                increase_ant_id(ANT_ID)
             # Print to text editor
             editor.insert(tk.END, "✅ Fine - Collaudo SUPERATO!\n\n", "green")
         else:
@@ -1310,14 +2993,54 @@ async def async_operation() -> None:
                 set_indicator(canvas2, report_indicator, "red")
             set_indicator(canvas, buttons_indicator, "red")
             editor.insert(tk.END, "❌ Fine - Collaudo NON SUPERATO!\n\n", "red")
-            # Close BLE connection
-            await client.disconnect()
-            await asyncio.sleep(1 - 2)
 
     except Exception as e:
         # Print to console
         print(f"❌ Errore durante async_operation(): {e}\n\n")
 
+    # Archive the transcript of the test on disk
+    await archive_transcript(user_input if FINAL_TEST == "true" else "", ble_address)
+
+
+async def archive_transcript(serial_number: str, ble_address: str) -> None:
+    """
+    @description: Appends the transcript of the test shown in the editor to the compressed archive of the day, in a
+                  separate thread so the BLE worker never waits for the disk. Enabled by TRANSCRIPT_ARCHIVE.
+
+    @param serial_number: The serial number of the tested unit (empty if not available).
+    @param ble_address: The BLE address of the tested unit (empty if not connected).
+    """
+    transcript = editor.take_transcript()
+
+    if TRANSCRIPT_ARCHIVE == "true":
+        await asyncio.to_thread(write_transcript_archive, serial_number, ble_address, transcript)
+
+
+def write_transcript_archive(serial_number: str, ble_address: str, transcript: str) -> None:
+    """
+    @description: Appends a test transcript to the archive of the day (transcripts/YYYYMMDD.log.gz). Each transcript is
+                  a new gzip member, preceded by a header with date, time, serial number and BLE address, so the file
+                  can be read with any gzip tool (e.g. zcat) and searched by serial number or address.
+
+    @param serial_number: The serial number of the tested unit (empty if not available).
+    @param ble_address: The BLE address of the tested unit (empty if not connected).
+    @param transcript: The text of the test.
+    """
+    try:
+        now = datetime.now()
+        archive_dir = os.path.join(get_application_path(), transcript_dir_path)
+        os.makedirs(archive_dir, exist_ok=True)
+
+        with gzip.open(os.path.join(archive_dir, f"{now.strftime('%Y%m%d')}.log.gz"), "at",
+                       encoding="utf-8") as archive_file:
+            archive_file.write(f"===== {now.strftime('%d/%m/%Y;%H.%M.%S')};{serial_number};{ble_address} =====\n")
+            archive_file.write(transcript)
+            archive_file.write("\n")
+
+    except Exception as e:
+        # Print to console
+        print(f"❌ Errore durante write_transcript_archive(): {e}\n")
+
 
 def create_new_windows(name: str) -> tk.Tk:
     """
@@ -1457,6 +3180,37 @@ def create_report(f1: tk.Frame, t: str, r1: int, c1: int, f2: tk.Frame, w: int,
         editor.insert(tk.END, f"❌ Errore durante create_report(): {e}\n\n", "red")
 
 
+def create_buttons_grid(frame, row: int, column: int) -> tuple[tk.Canvas, list]:
+    """
+    @description: Creates the grid of the buttons of the product under test as a single canvas with one text item per
+                  button, in two columns. The first half of the buttons fills the first column. The canvas spans two
+                  columns and as many rows of the frame grid layout as the buttons in a column.
+
+    @param frame: The parent Tkinter frame where the canvas will be placed.
+    @param row: Grid row index of the first row of the buttons grid.
+    @param column: Grid column index of the first column of the buttons grid.
+
+    @return canv, items: The created canvas and the list of the text item identifiers, in button order.
+    """
+    try:
+        rows = (len(product.buttons) + 1) // 2
+        canv = tk.Canvas(frame, width=2 * BUTTON_CELL_WIDTH, height=rows * BUTTON_CELL_HEIGHT, highlightthickness=0)
+        canv.grid(row=row, column=column, rowspan=rows, columnspan=2, padx=1, pady=1)
+
+        items = []
+        for i, text in enumerate(product.buttons):
+            # Determines the column (0 for first half, 1 for the rest)
+            x = (i // rows + 0.5) * BUTTON_CELL_WIDTH
+            y = (i % rows + 0.5) * BUTTON_CELL_HEIGHT
+            items.append(canv.create_text(x, y, text=text, fill="red", font=("Arial", 16, "bold")))
+
+        return canv, items
+
+    except Exception as e:
+        # Print to text editor
+        editor.insert(tk.END, f"❌ Errore durante create_buttons_grid(): {e}\n\n", "red")
+
+
 def create_new_button(frame, text: str, width: int, height: int, command, x: int, y: int) -> tk.Button:
     """
     @description: Creates and places a Tkinter button within a given frame using absolute positioning. The button is
@@ -1520,67 +3274,254 @@ def create_custom_editor(frame, device_name, sw_test_vers: str, sett_file_vers:
         editor.insert(tk.END, f"❌ Errore durante create_custom_editor(): {e}\n\n", "red")
 
 
-async def read_eeprom_parameter(client: BleakClient, parameter_req) -> int:
+async def read_eeprom_payload(client: BleakClient, parameter_req) -> bytes:
     """
-    @description: Sends a read request to the BLE device for a specific EEPROM parameter, then reads and decodes
-                  the response, extracting the payload and converting it to an integer using little-endian format.
+    @description: Sends a read request to the BLE device for an EEPROM area, then reads the response and extracts the
+                  payload.
 
     @param client: Connected BLE client used to communicate with the target device.
     @param parameter_req: Byte sequence representing the EEPROM read request.
 
-    @return data: Integer value decoded from the EEPROM payload.
+    @return data_bytes: The payload bytes of the response.
     """
-    try:
-        # Write on BLE an EEPROM parameter read request
-        await client.write_gatt_char(UUID_EEPROM_WRITE, parameter_req)
-        # Read EEPROM parameter data from BLE
-        value = await client.read_gatt_char(UUID_EEPROM_READ)
+    # Write on BLE an EEPROM parameter read request
+    await client.write_gatt_char(UUID_EEPROM_WRITE, parameter_req)
+    # Read EEPROM parameter data from BLE
+    value = await client.read_gatt_char(UUID_EEPROM_READ)
 
-        # Extract data length (2 bytes little endian) to 3 up 4 indexes
-        length = int.from_bytes(value[3:5], byteorder='little')
+    # Extract data length (2 bytes little endian) to 3 up 4 indexes
+    length = int.from_bytes(value[3:5], byteorder='little')
 
-        # Extract payload to index 5
-        data_bytes = value[5:5 + length]
+    # Extract payload to index 5
+    return bytes(value[5:5 + length])
 
-        # Decode data (little endian)
-        data = int.from_bytes(data_bytes, byteorder='little')
 
-        # Return decoded data
-        return data
+async def read_eeprom_image(client: BleakClient) -> bytes:
+    """
+    @description: Reads the whole EEPROM parameter area (addresses 0x01 - 0x07) with a single BLE round trip.
+
+    @param client: Connected BLE client used to communicate with the target device.
+
+    @return image: The raw bytes of the parameter area, empty if the read failed.
+    """
+    try:
+        return await read_eeprom_payload(client, EEPROM_BLOCK_READ_REQUEST)
+
     except Exception as e:
-        editor.insert(tk.END, f"❌ Errore durante read_eeprom_parameter(): {e}\n", "red")
+        editor.insert(tk.END, f"❌ Errore durante read_eeprom_image(): {e}\n", "red")
+        return b""
 
 
-async def write_eeprom_parameter(client: BleakClient, byte_length, parameter_req, value) -> None:
+def decode_eeprom_image(image: bytes) -> dict:
     """
-    @description: Writes a parameter value to the BLE device's EEPROM using the specified request code.
-                  Handles formatting based on the byte length (1 or 2 bytes), applying big or little endian conversion
-                  as required. If an unsupported length is provided, a warning is displayed.
+    @description: Decodes every field of EEPROM_FIELDS from an image of the EEPROM parameter area.
+
+    @param image: The raw bytes of the parameter area, starting at EEPROM_BLOCK_START.
+
+    @return data: Dictionary of the decoded fields (name: integer value, None if missing in the image).
+    """
+    data = {}
+
+    for name, (address, length) in EEPROM_FIELDS.items():
+        offset = address - EEPROM_BLOCK_START
+        field = image[offset:offset + length]
+        data[name] = int.from_bytes(field, byteorder='little') if len(field) == length else None
+
+    return data
+
+
+def build_eeprom_image(image: bytes, fields: dict) -> bytes:
+    """
+    @description: Builds the expected image of the EEPROM parameter area, replacing the given fields (little endian)
+                  in a copy of the current image. Missing bytes of the current image are filled with zeros.
+
+    @param image: The raw bytes of the current parameter area.
+    @param fields: Dictionary of the field values to set (name: integer value).
+
+    @return expected: The expected image of the parameter area.
+    """
+    expected = bytearray(image[:EEPROM_BLOCK_LENGTH].ljust(EEPROM_BLOCK_LENGTH, b"\x00"))
+
+    for name, value in fields.items():
+        address, length = EEPROM_FIELDS[name]
+        offset = address - EEPROM_BLOCK_START
+        expected[offset:offset + length] = value.to_bytes(length, byteorder='little')
+
+    return bytes(expected)
+
+
+def diff_eeprom_image(image: bytes, expected: bytes, fields) -> list:
+    """
+    @description: Compares the given fields in the current image of the EEPROM parameter area with the expected one.
+                  A field differing in any byte is written whole, one field per write request, as the firmware
+                  accepts only one parameter per frame.
+
+    @param image: The raw bytes of the current parameter area.
+    @param expected: The expected image of the parameter area.
+    @param fields: Names of the EEPROM_FIELDS to compare.
+
+    @return writes: A list of [name, address, bytes] writes, sorted by address.
+    """
+    writes = []
+
+    for name in fields:
+        address, length = EEPROM_FIELDS[name]
+        offset = address - EEPROM_BLOCK_START
+        value = expected[offset:offset + length]
+        if image[offset:offset + length] != value:
+            writes.append([name, address, value])
+
+    return sorted(writes, key=lambda write: write[1])
+
+
+async def program_eeprom_delta(client: BleakClient, image: bytes, fields: dict) -> bytes:
+    """
+    @description: Programs the given fields in the EEPROM parameter area writing only the fields that differ from the
+                  current image, then verifies only the written fields. Nothing is written when the EEPROM is already
+                  correct (e.g. a unit re-tested after rework). The result notification of each write only shortens
+                  the wait: the EEPROM is always read back, even when a write was not notified.
 
     @param client: Connected BLE client used to communicate with the target device.
-    @param byte_length: Number of bytes to encode the value (supported: 1 or 2).
-    @param parameter_req: Byte sequence representing the EEPROM request prefix.
-    @param value: Integer value to be encoded and written to the EEPROM.
+    @param image: The raw bytes of the current parameter area.
+    @param fields: Dictionary of the field values to program (name: integer value).
+
+    @return image: The image of the parameter area after programming (read back if something was written).
     """
+    expected = build_eeprom_image(image, fields)
+    writes = diff_eeprom_image(image, expected, fields)
+
+    if not writes:
+        # Print to text editor
+        editor.insert(tk.END, "Dati in EEPROM già corretti, nessuna scrittura\n\n")
+        return image
+
+    for name, address, data in writes:
+        await write_eeprom_block_transaction(client, address, data)
+    # Print to text editor
+    editor.insert(tk.END, f"Scritti {len(writes)} parametri in EEPROM "
+                          f"({', '.join(f'{name} 0x{address:02X}' for name, address, _ in writes)})\n\n")
+
+    # Verify only the written fields
+    return await read_eeprom_image_until(client, {name: fields[name] for name, _, _ in writes})
+
+
+def save_eeprom_dump(serial_number: str, ble_address: str, image: bytes, written_image: bytes) -> None:
+    """
+    @description: Saves the EEPROM parameter area of the tested unit, before and after programming, in a JSON file of
+                  the eeprom_dump folder for traceability. Enabled by EEPROM_DUMP.
+
+    @param serial_number: The serial number of the unit (empty if not available).
+    @param ble_address: The BLE address of the unit.
+    @param image: The raw bytes of the parameter area read before programming.
+    @param written_image: The raw bytes of the parameter area after programming.
+    """
+    if EEPROM_DUMP != "true":
+        return
+
     try:
-        # Prepare data to write in right format (little endian, only if data >= 2 bytes)
-        if byte_length == 1:
-            value_byte = value.to_bytes(byte_length, byteorder='big')
-        elif byte_length == 2:
-            value_byte = number_to_2_bytes(value)
-        else:
-            value_byte = 0
-            editor.insert(tk.END, f"Lunghezza del dato non gestita\n", "orange")
+        now = datetime.now()
+        dump_dir = os.path.join(get_application_path(), eeprom_dump_dir_path)
+        os.makedirs(dump_dir, exist_ok=True)
+        unit_id = "_".join(field for field in (serial_number, ble_address.replace(":", "")) if field)
+
+        dump = {
+            "date": now.strftime("%d/%m/%Y %H.%M.%S"),
+            "serial_number": serial_number,
+            "ble_address": ble_address,
+            "start_address": EEPROM_BLOCK_START,
+            "before": image.hex(" "),
+            "after": written_image.hex(" "),
+            "fields": decode_eeprom_image(written_image)
+        }
+        with open(os.path.join(dump_dir, f"{now.strftime('%Y%m%d_%H%M%S')}_{unit_id}.json"), "w",
+                  encoding="utf-8") as dump_file:
+            json.dump(dump, dump_file, indent=2)
 
-        # Write data on EEPROM
-        await client.write_gatt_char(UUID_EEPROM_WRITE, parameter_req + value_byte)
     except Exception as e:
-        editor.insert(tk.END, f"❌ Errore durante write_eeprom_parameter(): {e}\n", "red")
+        # Print to text editor
+        editor.insert(tk.END, f"❌ Errore durante save_eeprom_dump(): {e}\n\n", "red")
+
+
+async def write_eeprom_block_transaction(client: BleakClient, address: int, data: bytes) -> bool:
+    """
+    @description: Writes a run of bytes to the EEPROM and waits for the result notification of the request, up to
+                  EEPROM_TIMEOUT seconds. UUID_EEPROM_RESULT notifications must be enabled.
+
+    @param client: Connected BLE client used to communicate with the target device.
+    @param address: EEPROM address of the first byte.
+    @param data: Bytes to write.
+
+    @return bool: True if the device notified the result of the request, False otherwise. The notification only
+                  shortens the wait, the written data must be verified by reading the EEPROM back.
+    """
+    global eeprom_pending
+
+    future = asyncio.get_running_loop().create_future()
+    request = (EEPROM_WRITE_OPCODE, address, future)
+    eeprom_pending.append(request)
+
+    try:
+        await client.write_gatt_char(UUID_EEPROM_WRITE,
+                                     bytearray([EEPROM_WRITE_OPCODE, address, 0x00, len(data), 0x00]) + data)
+        async with asyncio.timeout(EEPROM_TIMEOUT):
+            await future
+        return True
+
+    except TimeoutError:
+        editor.insert(tk.END, f"⚠️ Nessuna conferma EEPROM entro {EEPROM_TIMEOUT}s\n", "orange")
+        return False
+    finally:
+        future.cancel()
+        if request in eeprom_pending:
+            eeprom_pending.remove(request)
+
+
+async def read_eeprom_image_until(client: BleakClient, expected: dict) -> bytes:
+    """
+    @description: Reads back the EEPROM parameter area until the given fields match the expected values, with a short
+                  exponential backoff between the reads, up to EEPROM_TIMEOUT seconds.
+
+    @param client: Connected BLE client used to communicate with the target device.
+    @param expected: Dictionary of the expected field values (name: integer value).
+
+    @return image: The last image of the parameter area read from the EEPROM.
+    """
+    delay = EEPROM_POLL_DELAY
+    image = b""
+
+    try:
+        async with asyncio.timeout(EEPROM_TIMEOUT):
+            while True:
+                image = await read_eeprom_image(client)
+                data = decode_eeprom_image(image)
+                if all(data[name] == value for name, value in expected.items()):
+                    break
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, EEPROM_POLL_MAX_DELAY)
+
+    except TimeoutError:
+        pass
+
+    return image
 
 
 #######################################################################################################################
 # PROGRAM
 #######################################################################################################################
 
-# Start main program
-main()
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["validate"]:
+        # Batch validation of a file of serial numbers, without GUI
+        sys.exit(validate_serials_cli(sys.argv[2:]))
+    if sys.argv[1:2] == ["generate"]:
+        # Generation of serial numbers for the label printer, without GUI
+        sys.exit(generate_serials_cli(sys.argv[2:]))
+    if sys.argv[1:2] == ["find"]:
+        # Lookup in the test record store, without GUI
+        sys.exit(find_records_cli(sys.argv[2:]))
+    if sys.argv[1:2] == ["export"]:
+        # Export of the test record store to a SAP LOG file, without GUI
+        sys.exit(export_records_cli(sys.argv[2:]))
+
+    # Start main program
+    main()
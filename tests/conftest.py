@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+# square_main.py is a script in the repository root, not an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import square_main  # noqa: E402
+
+
+class FakeEditor:
+    """
+    @description: Stand-in for the Tk text editor, collecting the inserted messages.
+    """
+    def __init__(self):
+        self.lines = []
+
+    def insert(self, index, text, *tags):
+        self.lines.append(text)
+
+
+@pytest.fixture
+def editor(monkeypatch):
+    fake = FakeEditor()
+    monkeypatch.setattr(square_main, "editor", fake, raising=False)
+    return fake
+
+
+@pytest.fixture
+def registry():
+    square_main.read_product_registry(square_main.products_file_path)
+    return square_main.products_by_name
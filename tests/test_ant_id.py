@@ -0,0 +1,56 @@
+import sqlite3
+
+import pytest
+
+import square_main
+
+
+def allocator(tmp_path, station="A", block_size=3, seed=10):
+    return square_main.AntIdAllocator(str(tmp_path / "ant_id.db"), station, block_size, seed)
+
+
+def test_blocks_are_not_shared(tmp_path):
+    first, second = allocator(tmp_path, "A"), allocator(tmp_path, "B")
+    assert first.peek() == 10
+    assert second.peek() == 13
+    assert [first.consume("SQ1"), first.consume("SQ2"), first.consume("SQ3")] == [10, 11, 12]
+    # Block used up, the next one follows the block of the other station
+    assert first.peek() == 16
+    first.close()
+    second.close()
+
+
+def test_restart_resumes_the_block(tmp_path):
+    first = allocator(tmp_path)
+    first.consume("SQ1")
+    first.close()
+
+    restarted = allocator(tmp_path)
+    assert restarted.peek() == 11
+    restarted.close()
+
+
+def test_wrap_after_ant_id_max(tmp_path):
+    store = allocator(tmp_path, seed=square_main.ANT_ID_MAX - 1)
+    assert [store.consume(str(i)) for i in range(3)] == [square_main.ANT_ID_MAX - 1, square_main.ANT_ID_MAX, 1]
+    store.close()
+
+
+def test_failed_journal_write_keeps_the_ant_id(tmp_path, editor, monkeypatch):
+    store = allocator(tmp_path)
+    monkeypatch.setattr(square_main, "ant_id_allocator", store, raising=False)
+    assert store.peek() == 10
+
+    # Another station holds the write lock of the store
+    other = sqlite3.connect(str(tmp_path / "ant_id.db"), isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    store._connection.execute("PRAGMA busy_timeout = 0")
+    assert square_main.consume_ant_id("SQ1") is False
+    other.execute("ROLLBACK")
+    other.close()
+
+    # The same ANT ID is given again and recorded once the store is writable
+    assert store.peek() == 10
+    assert square_main.consume_ant_id("SQ1") is True
+    assert store.peek() == 11
+    store.close()
@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+import square_main
+
+# buttons_offset of SQUARE in products.toml
+BUTTONS_OFFSET = 2
+
+
+def list_algorithm(notifications, length):
+    """
+    @description: Reference copy of the list based button algorithm replaced by the bitmask engine.
+
+    @return states: The pressed buttons (0/1 per button) after each notification, None before the first comparison.
+    """
+    memory = [0] * (2 * length)
+    pressed = [0] * (2 * length)
+    states = []
+
+    for iteration, data in enumerate(notifications):
+        counts = []
+        for byte in data:
+            counts.append((byte >> 4) & 0x0F)
+            counts.append(byte & 0x0F)
+        if iteration > 0:
+            pressed = [min(x + abs(a - b), 1) for x, a, b in zip(pressed, counts, memory)]
+            states.append(pressed[BUTTONS_OFFSET:])
+        else:
+            states.append(None)
+        memory = counts
+
+    return states
+
+
+@pytest.fixture
+def square(registry, editor, monkeypatch):
+    device = registry["SQUARE"]
+    monkeypatch.setattr(square_main, "product", device)
+    monkeypatch.setattr(square_main, "update_labels", lambda array: None)
+    square_main.reset_button_state()
+    return device
+
+
+def engine_state(device):
+    return [1 if square_main.buttons_pressed_mask & bit else 0 for bit in device.button_bits]
+
+
+def random_notifications(rng, length, count):
+    data = bytearray(rng.randbytes(length))
+    notifications = [bytes(data)]
+    for _ in range(count):
+        # Mostly single counter increments, sometimes repeated or arbitrary payloads
+        choice = rng.random()
+        if choice < 0.6:
+            nibble = rng.randrange(2 * length)
+            shift = 4 if nibble % 2 == 0 else 0
+            byte = data[nibble // 2]
+            counter = ((byte >> shift) + 1) & 0x0F
+            data[nibble // 2] = (byte & ~(0x0F << shift) & 0xFF) | (counter << shift)
+        elif choice < 0.9:
+            data = bytearray(rng.randbytes(length))
+        notifications.append(bytes(data))
+    return notifications
+
+
+def test_button_bits_layout(square):
+    assert len(square.button_bits) == len(square.buttons) == 20
+    assert square.target_mask == sum(square.button_bits)
+    # Bit 0 of every counter after the 2 leading ones, high nibble first
+    for j, bit in enumerate(square.button_bits):
+        payload = bytearray(square.payload_length)
+        nibble = BUTTONS_OFFSET + j
+        payload[nibble // 2] = 0x10 if nibble % 2 == 0 else 0x01
+        assert int.from_bytes(payload, byteorder='big') == bit
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_engine_matches_list_algorithm(square, seed):
+    rng = random.Random(seed)
+    notifications = random_notifications(rng, square.payload_length, 200)
+
+    for data, expected in zip(notifications, list_algorithm(notifications, square.payload_length)):
+        square_main.notification_handler(None, bytearray(data))
+        assert engine_state(square) == (expected or [0] * len(square.buttons))
+        assert square_main.button_event.is_set() == (expected is not None and all(expected))
+
+
+@pytest.mark.parametrize("delta", range(1, 16))
+def test_nibble_collapse(square, delta):
+    # Any change of a counter, in any of its 4 bits, marks only that button
+    reference = bytes(square.payload_length)
+    for j in range(len(square.buttons)):
+        square_main.reset_button_state()
+        nibble = BUTTONS_OFFSET + j
+        data = bytearray(reference)
+        data[nibble // 2] = delta << 4 if nibble % 2 == 0 else delta
+        square_main.notification_handler(None, bytearray(reference))
+        square_main.notification_handler(None, data)
+        assert square_main.buttons_pressed_mask == square.button_bits[j]
+
+
+def test_leading_counters_ignored(square):
+    square_main.notification_handler(None, bytearray(square.payload_length))
+    square_main.notification_handler(None, bytearray([0xFF]) + bytes(square.payload_length - 1))
+    assert square_main.buttons_pressed_mask == 0
+
+
+def test_invalid_length_ignored(square, editor):
+    square_main.notification_handler(None, bytearray(square.payload_length))
+    square_main.notification_handler(None, bytearray([0x11] * (square.payload_length + 1)))
+    assert square_main.buttons_pressed_mask == 0
+    assert any("lunghezza non valida" in line for line in editor.lines)
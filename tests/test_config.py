@@ -0,0 +1,15 @@
+import dataclasses
+
+import square_main
+
+
+def test_apply_config_publishes_every_field(monkeypatch):
+    names = [field.name for field in dataclasses.fields(square_main.Config)]
+    for name in names:
+        monkeypatch.setattr(square_main, name.upper(), getattr(square_main, name.upper(), None), raising=False)
+
+    cfg = square_main.Config(**{name: f"value of {name}" for name in names})
+    square_main.apply_config(cfg)
+
+    for name in names:
+        assert getattr(square_main, name.upper()) == f"value of {name}"
@@ -0,0 +1,101 @@
+import asyncio
+import collections
+
+import pytest
+
+import square_main
+from square_main import EEPROM_BLOCK_LENGTH, EEPROM_BLOCK_START, EEPROM_FIELDS
+
+
+def image_with(**fields):
+    return square_main.build_eeprom_image(bytes(EEPROM_BLOCK_LENGTH), fields)
+
+
+def test_build_and_decode_round_trip():
+    fields = {"ant_id": 0x1234, "hw_version": 7, "batch": 42, "producer": 3}
+    image = image_with(**fields)
+    assert square_main.decode_eeprom_image(image) == fields
+    # ANT ID little endian
+    offset = EEPROM_FIELDS["ant_id"][0] - EEPROM_BLOCK_START
+    assert image[offset:offset + 2] == b"\x34\x12"
+
+
+def test_diff_nothing_to_write():
+    image = image_with(ant_id=500, hw_version=2)
+    expected = square_main.build_eeprom_image(image, {"ant_id": 500, "hw_version": 2})
+    assert square_main.diff_eeprom_image(image, expected, ["ant_id", "hw_version"]) == []
+
+
+def test_diff_writes_whole_ant_id_when_one_byte_differs():
+    image = image_with(ant_id=0x0100)
+    expected = square_main.build_eeprom_image(image, {"ant_id": 0x0105})
+    assert square_main.diff_eeprom_image(image, expected, ["ant_id"]) == [["ant_id", 0x01, b"\x05\x01"]]
+
+
+def test_diff_one_parameter_per_frame():
+    image = image_with()
+    expected = square_main.build_eeprom_image(image, {"producer": 4, "batch": 3})
+    # Batch 0x06 and producer 0x07 are contiguous but written in separate frames
+    assert square_main.diff_eeprom_image(image, expected, ["producer", "batch"]) == [
+        ["batch", 0x06, b"\x03"], ["producer", 0x07, b"\x04"]]
+
+
+def test_diff_only_requested_fields():
+    image = image_with()
+    expected = image_with(ant_id=1, hw_version=2, batch=3, producer=4)
+    assert [name for name, _, _ in square_main.diff_eeprom_image(image, expected, ["hw_version"])] == ["hw_version"]
+
+
+def test_diff_short_image_writes_missing_fields():
+    expected = image_with(producer=0)
+    assert square_main.diff_eeprom_image(b"", expected, ["producer"]) == [["producer", 0x07, b"\x00"]]
+
+
+def test_program_reads_back_when_writes_are_not_notified(editor, monkeypatch):
+    writes = []
+
+    async def write(client, address, data):
+        writes.append((address, data))
+        return False
+
+    async def read_until(client, expected):
+        assert expected == {"batch": 3, "producer": 4}
+        return image_with(batch=3, producer=4)
+
+    monkeypatch.setattr(square_main, "write_eeprom_block_transaction", write)
+    monkeypatch.setattr(square_main, "read_eeprom_image_until", read_until)
+
+    result = asyncio.run(square_main.program_eeprom_delta(None, image_with(), {"batch": 3, "producer": 4}))
+    assert writes == [(0x06, b"\x03"), (0x07, b"\x04")]
+    assert square_main.decode_eeprom_image(result) == {"ant_id": 0, "hw_version": 0, "batch": 3, "producer": 4}
+
+
+def test_program_verifies_written_fields(editor, monkeypatch):
+    async def write(client, address, data):
+        return True
+
+    async def read_until(client, expected):
+        assert expected == {"ant_id": 0x0105}
+        return image_with(ant_id=0x0105, hw_version=2)
+
+    monkeypatch.setattr(square_main, "write_eeprom_block_transaction", write)
+    monkeypatch.setattr(square_main, "read_eeprom_image_until", read_until)
+
+    image = image_with(ant_id=0x0100, hw_version=2)
+    result = asyncio.run(square_main.program_eeprom_delta(None, image, {"ant_id": 0x0105, "hw_version": 2}))
+    assert square_main.decode_eeprom_image(result)["ant_id"] == 0x0105
+
+
+def test_result_notification_matches_opcode_and_address(editor, monkeypatch):
+    class Client:
+        async def write_gatt_char(self, uuid, payload, response=None):
+            # Late reply of another request first, then the reply of this one with any trailing payload
+            asyncio.get_running_loop().call_soon(square_main.notification_eeprom, None, bytearray([0x03, 0x04]))
+            asyncio.get_running_loop().call_soon(square_main.notification_eeprom, None,
+                                                 bytearray([0x03, 0x06, 0x00, 0x01, 0x00, 0x7F]))
+
+    monkeypatch.setattr(square_main, "eeprom_pending", collections.deque())
+    monkeypatch.setattr(square_main, "EEPROM_TIMEOUT", 1.0)
+    assert asyncio.run(square_main.write_eeprom_block_transaction(Client(), 0x06, b"\x03")) is True
+    assert any("non attesa" in line for line in editor.lines)
+    assert not square_main.eeprom_pending
@@ -0,0 +1,35 @@
+import asyncio
+
+import square_main
+
+
+class FakeClient:
+    def __init__(self, uuids, fw_version):
+        self.services = [type("Service", (), {"uuid": uuid})() for uuid in uuids]
+        self.fw_version = fw_version
+
+    async def read_gatt_char(self, uuid):
+        return self.fw_version.encode("utf-8")
+
+
+def test_layout_cached_per_firmware(tmp_path, editor, monkeypatch):
+    monkeypatch.setattr(square_main, "GATT_CACHE", "true")
+    monkeypatch.setattr(square_main, "gatt_cache", {})
+    monkeypatch.setattr(square_main, "get_application_path", lambda: str(tmp_path))
+
+    assert asyncio.run(square_main.update_gatt_cache(FakeClient(["b", "a"], "1.0"), False))
+    assert asyncio.run(square_main.update_gatt_cache(FakeClient(["c"], "2.0"), False))
+
+    assert square_main.gatt_cache == {"1.0": ["a", "b"], "2.0": ["c"]}
+    assert (tmp_path / square_main.gatt_cache_file_path).exists()
+
+
+def test_failed_cache_write_does_not_fail_the_connection(tmp_path, editor, monkeypatch):
+    monkeypatch.setattr(square_main, "GATT_CACHE", "true")
+    monkeypatch.setattr(square_main, "gatt_cache", {})
+    # Missing folder: the cache file cannot be created
+    monkeypatch.setattr(square_main, "get_application_path", lambda: str(tmp_path / "missing"))
+
+    assert asyncio.run(square_main.update_gatt_cache(FakeClient(["a"], "1.0"), False))
+    assert square_main.gatt_cache == {"1.0": ["a"]}
+    assert any("Cache GATT non salvata" in line for line in editor.lines)
@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import time
+
+import pytest
+
+import square_main
+from square_main import LOG_FIELDS
+
+
+@pytest.fixture
+def writer_env(editor, monkeypatch):
+    colours = []
+    monkeypatch.setattr(square_main, "set_indicator", lambda canv, indicator, colour: colours.append(colour))
+    monkeypatch.setattr(square_main, "canvas2", None, raising=False)
+    monkeypatch.setattr(square_main, "report_indicator", None, raising=False)
+    monkeypatch.setattr(square_main, "LOG_FSYNC_INTERVAL", 0.01)
+    monkeypatch.setattr(square_main, "LOG_RETRY_INTERVAL", 0.01)
+    monkeypatch.setattr(square_main, "LOG_CLOSE_RETRY_DELAY", 0.01)
+    return colours
+
+
+def record(serial):
+    return [serial if field == "Serial_Number" else "x" for field in LOG_FIELDS]
+
+
+def log_rows(path):
+    with open(path, encoding="utf-8") as data_file:
+        return data_file.read().splitlines()
+
+
+def test_records_written_and_stored(tmp_path, writer_env):
+    store = square_main.TestRecordStore(str(tmp_path / "records.db"))
+    writer = square_main.LogWriter(str(tmp_path / "sap_log.txt"), store)
+    writer.start()
+    writer.write(record("SQ1"))
+    writer.write(record("SQ2"))
+    writer.close()
+
+    assert log_rows(tmp_path / "sap_log.txt") == [";".join(LOG_FIELDS), ";".join(record("SQ1")),
+                                                   ";".join(record("SQ2"))]
+    assert [row[2] for row in store.find("Serial_Number", "SQ2")] == ["SQ2"]
+    store.close()
+
+
+def test_failed_write_is_retried(tmp_path, writer_env, editor, monkeypatch):
+    failures = [OSError("disco pieno")]
+    fsync = os.fsync
+
+    def flaky_fsync(fd):
+        if failures:
+            raise failures.pop()
+        fsync(fd)
+
+    monkeypatch.setattr(square_main.os, "fsync", flaky_fsync)
+    writer = square_main.LogWriter(str(tmp_path / "sap_log.txt"))
+    writer.start()
+    writer.write(record("SQ1"))
+    writer.close()
+
+    # Written exactly once, after the retry
+    assert log_rows(tmp_path / "sap_log.txt") == [";".join(LOG_FIELDS), ";".join(record("SQ1"))]
+    assert any("disco pieno" in line for line in editor.lines)
+    assert "red" in writer_env
+    assert not writer.failed
+
+
+def test_failed_store_insert_is_retried_without_rewriting_the_log(tmp_path, writer_env, monkeypatch):
+    store = square_main.TestRecordStore(str(tmp_path / "records.db"))
+    insert = store.insert
+    failures = [sqlite3.OperationalError("database is locked")]
+
+    def flaky_insert(records):
+        if failures:
+            raise failures.pop()
+        insert(records)
+
+    monkeypatch.setattr(store, "insert", flaky_insert)
+    writer = square_main.LogWriter(str(tmp_path / "sap_log.txt"), store)
+    writer.start()
+    writer.write(record("SQ1"))
+    writer.close()
+
+    assert log_rows(tmp_path / "sap_log.txt") == [";".join(LOG_FIELDS), ";".join(record("SQ1"))]
+    assert len(store.find("Serial_Number", "SQ1")) == 1
+    store.close()
+
+
+def test_unopenable_log_is_retried(tmp_path, writer_env, editor):
+    folder = tmp_path / "missing"
+    writer = square_main.LogWriter(str(folder / "sap_log.txt"))
+    writer.start()
+    writer.write(record("SQ1"))
+
+    # The file becomes writable while the writer is retrying
+    for _ in range(500):
+        if editor.lines:
+            break
+        time.sleep(0.01)
+    folder.mkdir()
+    assert writer.close() == 0
+
+    assert log_rows(folder / "sap_log.txt") == [";".join(LOG_FIELDS), ";".join(record("SQ1"))]
+    assert "red" in writer_env
+
+
+def test_close_reports_unsaved_records(tmp_path, writer_env):
+    writer = square_main.LogWriter(str(tmp_path / "missing" / "sap_log.txt"))
+    writer.start()
+    writer.write(record("SQ1"))
+    writer.write(record("SQ2"))
+
+    assert writer.close() == 2
+    assert not writer.is_alive()
@@ -0,0 +1,119 @@
+import random
+
+import pytest
+
+import square_main
+
+DATE = ["J", "26"]
+
+
+def bitwise_crc_16(data: bytes) -> int:
+    """
+    @description: Reference copy of the bitwise CRC-16 replaced by the table driven one.
+    """
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x6C49 if crc & 0x0001 else crc >> 1
+    return crc
+
+
+def make_serial(body: str) -> str:
+    return f"{body}{bitwise_crc_16(body.encode('utf-8')):04X}"
+
+
+@pytest.fixture
+def square(registry):
+    return registry["SQUARE"]
+
+
+def test_table_crc_matches_bitwise_crc():
+    rng = random.Random(0)
+    for length in range(0, 40):
+        data = rng.randbytes(length)
+        assert square_main.get_crc_16(data) == bitwise_crc_16(data)
+
+
+def test_table_crc_can_be_continued():
+    data = b"SQJ260001"
+    assert square_main.get_crc_16(data[5:], square_main.get_crc_16(data[:5])) == bitwise_crc_16(data)
+
+
+def test_valid_serial(square):
+    check = square_main.check_serial(make_serial("SQJ260001"), square, DATE)
+    assert check.valid
+    assert check.errors == check.warnings == []
+
+
+@pytest.mark.parametrize("serial", [
+    "SQJ26+00144A9",
+    "SQJ260_01792C",
+    "SQJ26 00144A9",
+    "SQJ26-0014",
+    "SQJ260001",
+    "SQJ260001+1A2",
+    "SQJ260001 1A2",
+    "SQJ260001ab12",
+    "SQJ26０001ABCD",
+])
+def test_malformed_serial(square, serial):
+    assert square_main.check_serial(serial, square, DATE).errors == ["format"]
+
+
+def test_serial_errors_and_warnings(square):
+    assert square_main.check_serial(make_serial("AVJ260001"), square, DATE).errors == ["prefix"]
+    assert square_main.check_serial(make_serial("SQJ260001") + "0", square, DATE).errors == ["length"]
+    assert square_main.check_serial(make_serial("SQJ260001")[:-1] + "0", square, DATE).errors == ["crc"]
+    assert square_main.check_serial(make_serial("SQA250001"), square, DATE).warnings == ["month", "year"]
+    assert square_main.check_serial(make_serial("SQJ260001"), None, DATE).errors == ["device"]
+
+
+def test_validate_serials(registry, monkeypatch):
+    monkeypatch.setattr(square_main, "get_month_code", lambda: DATE)
+    serials = [make_serial("SQJ260001"), "", make_serial("AVJ260002").lower(), make_serial("SQJ260001"),
+               "SQJ26+00144A9", make_serial("QQJ260003")]
+
+    checks = square_main.validate_serials(serials)
+
+    assert [check.serial for check in checks] == [serials[0], serials[2].upper(), serials[0], serials[4], serials[5]]
+    assert [check.errors for check in checks] == [[], [], ["duplicate"], ["format"], ["device"]]
+
+
+def test_validate_serials_of_one_product(registry, monkeypatch):
+    monkeypatch.setattr(square_main, "get_month_code", lambda: DATE)
+    checks = square_main.validate_serials([make_serial("SQJ260001"), make_serial("AVJ260002")], "square")
+    assert [check.errors for check in checks] == [[], ["prefix"]]
+
+
+def test_generated_serials_validate(registry, monkeypatch):
+    monkeypatch.setattr(square_main, "get_month_code", lambda: DATE)
+    device = registry["SQUARE"]
+
+    serials = list(square_main.generate_serials(device, "J", "26", 9990, 10))
+
+    assert serials[0] == make_serial("SQJ269990")
+    assert len(serials) == 10
+    assert all(check.valid for check in square_main.validate_serials(serials, device.name))
+
+
+def test_generate_serials_skips_and_rejects(registry):
+    device = registry["SQUARE"]
+    skip = {make_serial("SQJ260001")}
+    assert list(square_main.generate_serials(device, "J", "26", 0, 3, skip)) == [make_serial("SQJ260000"),
+                                                                                  make_serial("SQJ260002")]
+    with pytest.raises(ValueError):
+        square_main.generate_serials(device, "J", "26", 9999, 2)
+    with pytest.raises(ValueError):
+        square_main.generate_serials(registry["ZONA"], "J", "26", 0, 1)
+
+
+def test_validate_cli_rejects_unknown_product(tmp_path, capsys):
+    serials = tmp_path / "serials.txt"
+    serials.write_text(make_serial("SQJ260001") + "\n", encoding="utf-8")
+
+    with pytest.raises(SystemExit) as exit_info:
+        square_main.validate_serials_cli([str(serials), "--product", "SQUAR"])
+
+    assert exit_info.value.code == 2
+    assert "prodotto non trovato: SQUAR" in capsys.readouterr().err
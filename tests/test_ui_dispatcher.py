@@ -0,0 +1,54 @@
+import square_main
+
+
+class FakeWindow:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, function):
+        self.scheduled.append(function)
+
+
+class FakeCanvas:
+    def __init__(self, fail_items=()):
+        self.fills = {}
+        self.fail_items = set(fail_items)
+
+    def itemconfig(self, item, fill):
+        if item in self.fail_items:
+            raise RuntimeError("item destroyed")
+        self.fills[item] = fill
+
+
+def test_drain_merges_colours_and_skips_unchanged():
+    window = FakeWindow()
+    dispatcher = square_main.UiDispatcher(window)
+    canvas = FakeCanvas()
+
+    dispatcher.post_item_colour(canvas, 1, "red")
+    dispatcher.post_item_colour(canvas, 1, "green")
+    dispatcher._drain()
+    assert canvas.fills == {1: "green"}
+
+    canvas.fills.clear()
+    dispatcher.post_item_colour(canvas, 1, "green")
+    dispatcher._drain()
+    assert canvas.fills == {}
+
+
+def test_drain_keeps_running_after_failed_update():
+    window = FakeWindow()
+    dispatcher = square_main.UiDispatcher(window)
+    canvas = FakeCanvas(fail_items={1})
+    calls = []
+
+    dispatcher.post(lambda: 1 / 0)
+    dispatcher.post(calls.append, "after")
+    dispatcher.post_item_colour(canvas, 1, "red")
+    dispatcher.post_item_colour(canvas, 2, "green")
+    dispatcher._drain()
+
+    assert calls == ["after"]
+    assert canvas.fills == {2: "green"}
+    # Initial schedule plus the one of the drained frame
+    assert len(window.scheduled) == 2